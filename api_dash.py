@@ -2,6 +2,9 @@
 import streamlit as st
 import requests
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 
 st.set_page_config(page_title="Book & Sentiment API Explorer", layout="wide")
 
@@ -10,6 +13,34 @@ st.title("📚 Book Recommendation & Sentiment API Explorer")
 # Sidebar: API base URL
 base_url = st.sidebar.text_input("API Base URL", value="http://localhost:8001").rstrip('/')
 
+REQUEST_TIMEOUT = 120
+
+@st.cache_resource
+def get_session():
+    """One keep-alive connection pool shared by every call, sized for a full comparison."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def timed_post(session, url, payload):
+    """POST and return (status, body, seconds); status is None if the request failed."""
+    start = time.perf_counter()
+    try:
+        resp = session.post(url, json=payload, timeout=REQUEST_TIMEOUT)
+        try:
+            body = resp.json()
+        except ValueError:
+            body = resp.text
+        return resp.status_code, body, time.perf_counter() - start
+    except requests.exceptions.RequestException as e:
+        return None, str(e), time.perf_counter() - start
+
+# Responses of earlier comparisons, keyed by (url, payload)
+if "response_cache" not in st.session_state:
+    st.session_state.response_cache = {}
+
 # Create tabs for clear separation
 tab1, tab2 = st.tabs(["🔍 Sentiment Analysis", "🤖 Book Recommendations"]);
 
@@ -44,7 +75,7 @@ with tab1:
         url = f"{base_url}{endpoint}"
         try:
             with st.spinner("Calling Sentiment API..."):
-                resp = requests.post(url, json=payload)
+                resp = get_session().post(url, json=payload, timeout=REQUEST_TIMEOUT)
             if resp.status_code == 200:
                 data = resp.json()
                 st.subheader("Response JSON")
@@ -72,28 +103,105 @@ with tab2:
         "Hybrid": ("/recommend/hybrid", "titles", ["Dune", "Ender's Game"]),
     }
 
-    choice = st.selectbox("Recommendation Type", list(RECS.keys()))
-    path, p_type, sample = RECS[choice]
+    rec_mode = st.radio("Mode", ["Single Strategy", "Compare All"], index=0, horizontal=True)
 
-    if p_type == "query":
-        payload = {"query": st.text_input("Query", value=str(sample))}
-    else:
-        default = "\n".join(sample)
-        titles_text = st.text_area("Titles (one per line):", value=default, height=150)
+    if rec_mode == "Compare All":
+        st.write("Sends the same input to every selected strategy at once; results appear as each returns.")
+        selected = st.multiselect("Strategies", list(RECS.keys()), default=list(RECS.keys()))
+        query = st.text_input("Query (query-based strategies)", value="1984")
+        titles_text = st.text_area("Titles, one per line (title-based strategies):", value="Dune\nFoundation", height=100)
         titles = [t.strip() for t in titles_text.splitlines() if t.strip()]
-        payload = {"titles": titles}
+        use_cache = st.checkbox("Reuse cached responses for identical requests", value=True)
 
-    if st.button("Get Recommendations"):
-        url = f"{base_url}{path}"
-        try:
-            with st.spinner("Calling Recommendation API..."):
-                resp = requests.post(url, json=payload)
-            if resp.status_code == 200:
-                data = resp.json()
-                st.subheader("Response JSON")
-                st.json(data)
-            else:
-                st.error(f"API returned status {resp.status_code}")
-                st.text(resp.text)
-        except requests.exceptions.RequestException as e:
-            st.error(f"Request failed: {e}")
+        if st.button("Compare Strategies") and selected:
+            cache = st.session_state.response_cache
+            jobs = {}
+            for name in selected:
+                path, p_type, _ = RECS[name]
+                payload = {"query": query} if p_type == "query" else {"titles": titles}
+                jobs[name] = (f"{base_url}{path}", payload)
+
+            # Side-by-side slots, four per row, filled in completion order
+            slots = {}
+            for row_start in range(0, len(selected), 4):
+                for name, col in zip(selected[row_start:row_start + 4], st.columns(4)):
+                    with col:
+                        st.markdown(f"**{name}**")
+                        slots[name] = st.empty()
+                        slots[name].info("Waiting…")
+
+            def show(name, status, body, seconds, cached):
+                with slots[name].container():
+                    st.caption(f"cached · first request took {seconds * 1000:.0f} ms" if cached
+                               else f"{seconds * 1000:.0f} ms")
+                    if status == 200 and isinstance(body, list):
+                        st.dataframe(
+                            [{"title": b.get("title"), "author": b.get("author")} for b in body],
+                            hide_index=True,
+                        )
+                    elif status is None:
+                        st.error(f"Request failed: {body}")
+                    else:
+                        st.error(f"API returned status {status}")
+                        st.text(body if isinstance(body, str) else json.dumps(body))
+
+            # Only live requests are timed; cached ones would mix in old latencies
+            timings = []
+            from_cache = []
+            pending = {}
+            session = get_session()
+            with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+                for name, (url, payload) in jobs.items():
+                    key = (url, json.dumps(payload, sort_keys=True))
+                    if use_cache and key in cache:
+                        status, body, seconds = cache[key]
+                        show(name, status, body, seconds, cached=True)
+                        from_cache.append(name)
+                    else:
+                        pending[pool.submit(timed_post, session, url, payload)] = (name, key)
+                for future in as_completed(pending):
+                    name, key = pending[future]
+                    status, body, seconds = future.result()
+                    if status == 200:
+                        cache[key] = (status, body, seconds)
+                    show(name, status, body, seconds, cached=False)
+                    timings.append({"strategy": name, "ms": seconds * 1000, "status": status})
+
+            st.subheader("Latency per Strategy")
+            if timings:
+                timings.sort(key=lambda t: t["ms"])
+                st.dataframe(timings, hide_index=True)
+                st.bar_chart({t["strategy"]: t["ms"] for t in timings})
+            if from_cache:
+                st.caption("Served from the response cache, not timed: " + ", ".join(from_cache)
+                           + ". Untick the cache option to measure them.")
+
+        if st.button("Clear Response Cache"):
+            st.session_state.response_cache = {}
+
+    else:
+        choice = st.selectbox("Recommendation Type", list(RECS.keys()))
+        path, p_type, sample = RECS[choice]
+
+        if p_type == "query":
+            payload = {"query": st.text_input("Query", value=str(sample))}
+        else:
+            default = "\n".join(sample)
+            titles_text = st.text_area("Titles (one per line):", value=default, height=150)
+            titles = [t.strip() for t in titles_text.splitlines() if t.strip()]
+            payload = {"titles": titles}
+
+        if st.button("Get Recommendations"):
+            url = f"{base_url}{path}"
+            try:
+                with st.spinner("Calling Recommendation API..."):
+                    resp = get_session().post(url, json=payload, timeout=REQUEST_TIMEOUT)
+                if resp.status_code == 200:
+                    data = resp.json()
+                    st.subheader("Response JSON")
+                    st.json(data)
+                else:
+                    st.error(f"API returned status {resp.status_code}")
+                    st.text(resp.text)
+            except requests.exceptions.RequestException as e:
+                st.error(f"Request failed: {e}")
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+load_test.py
+
+Load-testing harness for the ``/sentiment/*`` and ``/recommend/*`` endpoints.
+
+Starts the mock Groq and Gemini servers from ``mock_upstream.py``, launches the
+backend with uvicorn pointed at them, then drives it open-loop at a target
+request rate (arrivals do not wait for earlier responses, so queueing shows up
+as tail latency). Reports throughput, latency percentiles and error rates per
+endpoint, printed and as JSON.
+
+Usage:
+    cd backend
+    python bench/load_test.py --rps 50 --duration 30 --workers 2
+    python bench/load_test.py --rps 20 --groq-latency lognormal:300:0.6 --groq-error-rate 0.05
+    python bench/load_test.py --target http://localhost:8001   # existing deployment, no mocks
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mock_upstream import MockGeminiServer, MockGroqServer  # noqa: E402
+from sentiment_bench import WORDS, git_revision, percentile  # noqa: E402
+
+DEFAULT_MIX = "sentiment/single=4,sentiment/batch=2,sentiment/local=2,recommend/similar=1,recommend/hybrid=1"
+QUERY_SAMPLES = ["1984", "Dune", "Fantasy", "George Orwell", "space opera epic", "Brave New World"]
+TITLE_SAMPLES = ["Dune", "Foundation", "The Hobbit", "Ender's Game", "Neuromancer", "Hyperion"]
+TITLE_ENDPOINTS = {"recommend/user_preferred", "recommend/collaborative", "recommend/hybrid"}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def parse_mix(spec: str) -> List[Tuple[str, float]]:
+    mix = []
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix.append((name.strip().strip("/"), float(weight or 1)))
+    return mix
+
+
+class PayloadFactory:
+    """Request bodies; ``unique_ratio`` controls how many miss the result cache."""
+
+    def __init__(self, rng: random.Random, unique_ratio: float, batch_size: int):
+        self.rng = rng
+        self.unique_ratio = unique_ratio
+        self.batch_size = batch_size
+        self.counter = 0
+        self.pool = [" ".join(rng.choice(WORDS) for _ in range(20)) for _ in range(50)]
+
+    def review(self) -> str:
+        if self.rng.random() < self.unique_ratio:
+            self.counter += 1
+            return f"{self.counter} " + " ".join(self.rng.choice(WORDS) for _ in range(20))
+        return self.rng.choice(self.pool)
+
+    def build(self, endpoint: str) -> Dict:
+        if endpoint == "sentiment/single":
+            return {"review": self.review()}
+        if endpoint.startswith("sentiment/"):
+            return {"reviews": [self.review() for _ in range(self.batch_size)]}
+        if endpoint in TITLE_ENDPOINTS:
+            return {"titles": self.rng.sample(TITLE_SAMPLES, 2)}
+        return {"query": self.rng.choice(QUERY_SAMPLES)}
+
+
+def item_errors(body) -> int:
+    """Count per-item ``error`` fields the sentiment endpoints return with HTTP 200."""
+    if isinstance(body, dict):
+        if "results" in body:
+            return sum(1 for r in body["results"] if r.get("error"))
+        return 1 if body.get("error") else 0
+    return 0
+
+
+async def drive(base_url: str, mix, args) -> Tuple[Dict[str, list], float]:
+    rng = random.Random(args.seed)
+    payloads = PayloadFactory(rng, args.unique_ratio, args.batch_size)
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    samples: Dict[str, list] = defaultdict(list)
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    in_flight = asyncio.Semaphore(args.max_in_flight)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        async def one(endpoint: str, body: Dict):
+            if in_flight.locked():
+                samples[endpoint].append(("dropped", 0.0, 0))
+                return
+            async with in_flight:
+                start = time.perf_counter()
+                try:
+                    resp = await client.post(f"/{endpoint}", json=body)
+                    elapsed = time.perf_counter() - start
+                    if resp.status_code == 200:
+                        samples[endpoint].append(("ok", elapsed, item_errors(resp.json())))
+                    else:
+                        samples[endpoint].append((f"http_{resp.status_code}", elapsed, 0))
+                except httpx.HTTPError as e:
+                    samples[endpoint].append((type(e).__name__, time.perf_counter() - start, 0))
+
+        tasks = []
+        started = time.perf_counter()
+        next_at = started
+        while next_at - started < args.duration:
+            # Poisson arrivals at the target rate
+            next_at += rng.expovariate(args.rps) if args.poisson else 1 / args.rps
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            endpoint = rng.choices(names, weights)[0]
+            tasks.append(asyncio.create_task(one(endpoint, payloads.build(endpoint))))
+        await asyncio.gather(*tasks)
+        wall = time.perf_counter() - started
+    return samples, wall
+
+
+def report(samples: Dict[str, list], wall: float) -> List[Dict]:
+    rows = []
+    for endpoint in sorted(samples):
+        entries = samples[endpoint]
+        ok = sorted(e[1] for e in entries if e[0] == "ok")
+        outcomes = defaultdict(int)
+        for outcome, _, _ in entries:
+            outcomes[outcome] += 1
+        failed = len(entries) - len(ok)
+        rows.append({
+            "endpoint": f"/{endpoint}",
+            "sent": len(entries),
+            "ok": len(ok),
+            "error_rate": failed / len(entries) if entries else 0.0,
+            "item_errors": sum(e[2] for e in entries),
+            "outcomes": dict(outcomes),
+            "throughput_rps": len(ok) / wall if wall else 0.0,
+            "p50_ms": percentile(ok, 50) * 1000,
+            "p95_ms": percentile(ok, 95) * 1000,
+            "p99_ms": percentile(ok, 99) * 1000,
+            "max_ms": (ok[-1] * 1000) if ok else float("nan"),
+        })
+    return rows
+
+
+def wait_ready(url: str, proc: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Backend exited with code {proc.returncode}")
+        try:
+            if httpx.get(f"{url}/metrics", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Backend at {url} not ready after {timeout:.0f}s")
+
+
+def start_backend(args, groq: MockGroqServer, gemini: MockGeminiServer) -> Tuple[subprocess.Popen, str]:
+    port = free_port()
+    env = dict(
+        os.environ,
+        GROQ_BASE_URL=groq.url,
+        GROQ_API_KEY=os.getenv("GROQ_API_KEY", "mock"),
+        GOOGLE_GEMINI_BASE_URL=gemini.url,
+        GEMINI_API_KEY=os.getenv("GEMINI_API_KEY", "mock"),
+    )
+    if args.model_path is not None:
+        env["SENTIMENT_MODEL_PATH"] = str(args.model_path)
+    cmd = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+           "--workers", str(args.workers), "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        wait_ready(url, proc)
+    except Exception:
+        proc.terminate()
+        raise
+    return proc, url
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load-test the backend against mock LLM providers")
+    parser.add_argument("--rps", type=float, default=20.0, help="Target request rate")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="endpoint=weight pairs, comma separated")
+    parser.add_argument("--batch-size", type=int, default=25, help="Reviews per batch request")
+    parser.add_argument("--unique-ratio", type=float, default=1.0,
+                        help="Share of reviews that are new (1.0 = no cache hits)")
+    parser.add_argument("--poisson", action="store_true", help="Poisson instead of evenly spaced arrivals")
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="Client-side cap; excess arrivals are dropped")
+    parser.add_argument("--max-connections", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--target", default=None, help="Existing backend URL; skips mocks and spawning")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the spawned backend")
+    parser.add_argument("--model-path", type=Path, default=None, help="Compact model dir for /sentiment/local")
+    parser.add_argument("--groq-latency", default="lognormal:250:0.4")
+    parser.add_argument("--groq-error-rate", type=float, default=0.0)
+    parser.add_argument("--groq-rate-limit", type=float, default=None, help="Mock Groq requests/sec before 429s")
+    parser.add_argument("--gemini-latency", default="lognormal:1500:0.4")
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0)
+    parser.add_argument("--gemini-rate-limit", type=float, default=None, help="Mock Gemini requests/sec before 429s")
+    parser.add_argument("--out", type=Path, default=Path("bench_load.json"))
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    mix = parse_mix(args.mix)
+    groq: Optional[MockGroqServer] = None
+    gemini: Optional[MockGeminiServer] = None
+    proc: Optional[subprocess.Popen] = None
+    try:
+        if args.target:
+            url = args.target.rstrip("/")
+        else:
+            groq = MockGroqServer(latency=args.groq_latency, error_rate=args.groq_error_rate,
+                                  rate_limit_rps=args.groq_rate_limit, seed=args.seed).start()
+            gemini = MockGeminiServer(latency=args.gemini_latency, error_rate=args.gemini_error_rate,
+                                      rate_limit_rps=args.gemini_rate_limit, seed=args.seed + 1).start()
+            proc, url = start_backend(args, groq, gemini)
+
+        print(f"Driving {url} at {args.rps:g} rps for {args.duration:g}s")
+        samples, wall = asyncio.run(drive(url, mix, args))
+        rows = report(samples, wall)
+        for row in rows:
+            print(
+                f"{row['endpoint']:28} sent={row['sent']:<6} ok={row['ok']:<6} err={row['error_rate']:6.1%} "
+                f"{row['throughput_rps']:7.1f} rps p50={row['p50_ms']:8.1f}ms p95={row['p95_ms']:8.1f}ms "
+                f"p99={row['p99_ms']:8.1f}ms"
+            )
+        result = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "git_revision": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "wall_seconds": wall,
+                "config": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+            },
+            "endpoints": rows,
+            "upstream": {
+                "groq": groq.stats if groq else None,
+                "gemini": gemini.stats if gemini else None,
+            },
+        }
+        args.out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"Results written to {args.out}")
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        for mock in (groq, gemini):
+            if mock is not None:
+                mock.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Local stand-ins for the Groq chat-completions and Gemini ``generateContent``
+APIs.
+
+Both answer the prompts built in ``core/util/utill.py`` and
+``core/util/recommender.py`` with deterministic fake data after a delay drawn
+from a configurable distribution. Streaming endpoints send the first event
+after ``first_chunk`` of that delay and spread the remaining events over the rest. They can also inject errors and enforce a
+rate limit, so benchmarks and load tests never touch the paid APIs. Point the
+SDKs at them with ``GROQ_BASE_URL`` / ``GOOGLE_GEMINI_BASE_URL``.
+
+Latency specs (milliseconds): ``"200"`` fixed, ``"uniform:100:300"``,
+``"normal:200:50"``, ``"lognormal:200:0.5"`` (median, sigma), ``"exp:200"`` (mean).
+"""
+
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+LABELS = ["Very Negative", "Negative", "Neutral", "Positive", "Very Positive"]
+GENRES = ["Fantasy", "Science Fiction", "Mystery", "Romance", "Biography", "History", "Thriller"]
+_SINGLE_RE = re.compile(r'Review: "(.*)"\s*$', re.S)
+
+
+def parse_latency(spec: str, rng: random.Random) -> Callable[[], float]:
+    """Turn a latency spec into a sampler returning seconds."""
+    kind, _, rest = str(spec).partition(":")
+    if not rest:
+        fixed = float(kind) / 1000
+        return lambda: fixed
+    args = [float(a) for a in rest.split(":")]
+    if kind == "uniform":
+        return lambda: max(0.0, rng.uniform(args[0], args[1])) / 1000
+    if kind == "normal":
+        return lambda: max(0.0, rng.gauss(args[0], args[1])) / 1000
+    if kind == "lognormal":
+        mu = math.log(args[0])
+        return lambda: rng.lognormvariate(mu, args[1]) / 1000
+    if kind == "exp":
+        return lambda: rng.expovariate(1 / args[0]) / 1000
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+def fake_sentiment(review: str) -> Dict:
+    digest = hashlib.blake2b(review.encode("utf-8"), digest_size=4).digest()
+    score = round(int.from_bytes(digest, "big") / 0xFFFFFFFF * 2 - 1, 4)
+    label = LABELS[min(int((score + 1) / 2 * len(LABELS)), len(LABELS) - 1)]
+    return {"review": review, "label": label, "score": score}
+
+
+def answer_prompt(prompt: str) -> Dict:
+    """Build the JSON object the sentiment prompts ask the model for."""
+    if "Reviews:\n" in prompt:
+        lines = prompt.split("Reviews:\n", 1)[1].split("\n")
+        numbered = (line.split(". ", 1) for line in lines if ". " in line)
+        return {"reviews": [
+            {"id": int(n), **{k: v for k, v in fake_sentiment(json.loads(text)).items() if k != "review"}}
+            for n, text in numbered
+        ]}
+    match = _SINGLE_RE.search(prompt)
+    return fake_sentiment(match.group(1) if match else prompt)
+
+
+def fake_books(prompt: str, n: int = 5) -> List[Dict]:
+    rng = random.Random(prompt)
+    return [
+        {
+            "title": f"Mock Book {i + 1} for {prompt[:40]}",
+            "author": f"Author {rng.randint(1, 500)}",
+            "genre": rng.choice(GENRES),
+            "description": "A generated stand-in used for load testing.",
+            "publication_year": rng.randint(1900, 2024),
+            "rating": round(rng.uniform(2.5, 5.0), 1),
+        }
+        for i in range(n)
+    ]
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class MockUpstream(ABC):
+    """Threaded HTTP server with latency, error injection and rate limiting."""
+
+    name = "upstream"
+    # share of the drawn latency spent before the first streamed event
+    first_chunk = 0.1
+
+    def __init__(self, latency: str = "0", error_rate: float = 0.0, rate_limit_rps: Optional[float] = None,
+                 rate_limit_burst: Optional[float] = None, seed: Optional[int] = None,
+                 host: str = "127.0.0.1", port: int = 0):
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._latency = parse_latency(latency, self._rng)
+        self.error_rate = error_rate
+        self.bucket = TokenBucket(rate_limit_rps, rate_limit_burst) if rate_limit_rps else None
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0}
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _draw(self) -> Tuple[float, bool]:
+        with self._rng_lock:
+            return self._latency(), self._rng.random() < self.error_rate
+
+    def _count(self, key: str) -> None:
+        with self._rng_lock:
+            self.stats[key] += 1
+
+    @abstractmethod
+    def handle(self, path: str, body: Dict) -> Tuple[int, Dict]:
+        """Return (status, payload) for a successful request."""
+
+    def stream(self, path: str, body: Dict) -> Optional[List[Dict]]:
+        """Events for a streaming request, or None if ``path`` does not stream."""
+        return None
+
+    def error_body(self, status: int, message: str) -> Dict:
+        return {"error": {"code": status, "message": message}}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                server._count("requests")
+                if server.bucket is not None and not server.bucket.take():
+                    server._count("rate_limited")
+                    self._reply(429, server.error_body(429, "Rate limit exceeded"), {"Retry-After": "1"})
+                    return
+                delay, fail = server._draw()
+                events = None if fail else server.stream(self.path, body)
+                # streaming: only the time to the first event is spent up front
+                time.sleep(delay if events is None else delay * server.first_chunk)
+                if fail:
+                    server._count("errors")
+                    self._reply(503, server.error_body(503, "Injected upstream failure"))
+                    return
+                if events is not None:
+                    self._stream(events, delay)
+                    return
+                self._reply(*server.handle(self.path, body))
+
+            def _stream(self, events: List[Dict], delay: float):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                gap = delay * (1 - server.first_chunk) / max(1, len(events) - 1)
+                for i, event in enumerate(events):
+                    self.wfile.write(f"data: {json.dumps(event)}\r\n\r\n".encode("utf-8"))
+                    self.wfile.flush()
+                    if i < len(events) - 1:
+                        time.sleep(gap)
+
+        return Handler
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+class MockGroqServer(MockUpstream):
+    """Imitates ``POST /openai/v1/chat/completions``."""
+
+    name = "groq"
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, latency: Optional[str] = None, **kwargs):
+        if latency is None:
+            latency = f"uniform:{latency_ms - jitter_ms}:{latency_ms + jitter_ms}" if jitter_ms else str(latency_ms)
+        super().__init__(latency=latency, **kwargs)
+
+    def handle(self, path: str, body: Dict) -> Tuple[int, Dict]:
+        prompt = body["messages"][-1]["content"]
+        return 200, {
+            "id": f"mock-{self.stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": json.dumps(answer_prompt(prompt))},
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+
+class MockGeminiServer(MockUpstream):
+    """Imitates ``POST /v1beta/models/<model>:generateContent`` and ``:streamGenerateContent``."""
+
+    name = "gemini"
+
+    def __init__(self, books: int = 5, chunk_chars: int = 40, **kwargs):
+        self.books = books
+        self.chunk_chars = chunk_chars
+        super().__init__(**kwargs)
+
+    def error_body(self, status: int, message: str) -> Dict:
+        return {"error": {"code": status, "message": message,
+                          "status": "RESOURCE_EXHAUSTED" if status == 429 else "UNAVAILABLE"}}
+
+    def handle(self, path: str, body: Dict) -> Tuple[int, Dict]:
+        prompt = body["contents"][0]["parts"][0]["text"]
+        return 200, {
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": json.dumps(fake_books(prompt, self.books))}]},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "modelVersion": path.rsplit("/", 1)[-1].split(":")[0],
+        }
+
+    def stream(self, path: str, body: Dict) -> Optional[List[Dict]]:
+        if ":streamGenerateContent" not in path:
+            return None
+        prompt = body["contents"][0]["parts"][0]["text"]
+        text = json.dumps(fake_books(prompt, self.books))
+        pieces = [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)]
+        return [
+            {
+                "candidates": [{
+                    "content": {"role": "model", "parts": [{"text": piece}]},
+                    "index": 0,
+                    **({"finishReason": "STOP"} if i == len(pieces) - 1 else {}),
+                }],
+                "modelVersion": path.rsplit("/", 1)[-1].split(":")[0],
+            }
+            for i, piece in enumerate(pieces)
+        ]
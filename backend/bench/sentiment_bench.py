@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+sentiment_bench.py
+
+Latency / throughput benchmark for the sentiment paths in ``core/sentiment.py``:
+
+* ``local`` - in-process compact TF-IDF model (``analyze_local``)
+* ``cache`` - LLM path with every review already in the result cache
+* ``llm``   - LLM path against a local mock Groq server (``mock_upstream.py``)
+
+Every case is a (path, review length, batch size) triple. Results are written as
+JSON and can be compared against a previous run to flag regressions.
+
+Usage:
+    cd backend
+    python bench/sentiment_bench.py --out bench_sentiment.json
+    python bench/sentiment_bench.py --baseline old.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mock_upstream import MockGroqServer  # noqa: E402
+
+PATHS = ["local", "cache", "llm"]
+REVIEW_LENGTHS = {"short": 8, "medium": 60, "long": 400}
+WORDS = (
+    "book story plot character ending writing author chapter pacing dialogue world "
+    "great good fine boring slow brilliant awful loved hated predictable moving "
+    "funny dark beautiful confusing gripping dull clever shallow memorable flat"
+).split()
+
+
+def make_reviews(n: int, n_words: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    return [f"{seed}-{i} " + " ".join(rng.choice(WORDS) for _ in range(n_words)) for i in range(n)]
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return float("nan")
+    pos = (len(sorted_values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def summarize(path: str, length: str, batch_size: int, latencies: List[float], errors: int,
+              fallbacks: int = 0) -> Dict:
+    ordered = sorted(latencies)
+    total = sum(latencies)
+    return {
+        "path": path,
+        "length": length,
+        "batch_size": batch_size,
+        "iterations": len(latencies),
+        "errors": errors,
+        # LLM calls answered by the local model instead; those timings are not Groq's
+        "fallbacks": fallbacks,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "mean_ms": total / len(latencies) * 1000,
+        "reviews_per_sec": batch_size * len(latencies) / total if total else float("inf"),
+    }
+
+
+def fallback_count(sentiment) -> float:
+    """Batch calls that failed over to the local model so far (see ``_local_fallback``)."""
+    return sentiment.EVENTS.value(provider="groq", event="fallback")
+
+
+def prepare(sentiment, path: str, reviews: List[str]):
+    """Reset the cache for ``path`` and return the function to time."""
+    if path == "local":
+        return sentiment.analyze_local
+    sentiment.result_cache.clear()
+    if path == "cache":
+        for review in reviews:
+            sentiment.result_cache.put(review, {"review": review, "label": "Neutral", "score": 0.0})
+    return sentiment.analyze_batch
+
+
+def run_case(sentiment, path: str, length: str, batch_size: int, args) -> Dict:
+    n_words = REVIEW_LENGTHS[length]
+    latencies: List[float] = []
+    errors = 0
+
+    # Untimed warm-up: the Groq SDK and client are created on the first LLM call
+    reviews = make_reviews(batch_size, n_words, seed=-1)
+    prepare(sentiment, path, reviews)(reviews)
+
+    fallbacks_before = fallback_count(sentiment)
+    started = time.perf_counter()
+    iteration = 0
+    while iteration < args.max_iterations and (
+        iteration < args.min_iterations or time.perf_counter() - started < args.min_time
+    ):
+        reviews = make_reviews(batch_size, n_words, seed=iteration)
+        fn = prepare(sentiment, path, reviews)
+
+        t0 = time.perf_counter()
+        out = fn(reviews)
+        latencies.append(time.perf_counter() - t0)
+        errors += sum(1 for item in out if item.get("error"))
+        iteration += 1
+    fallbacks = int(fallback_count(sentiment) - fallbacks_before)
+    return summarize(path, length, batch_size, latencies, errors, fallbacks)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Return human-readable regressions of ``current`` against ``baseline``."""
+    key = lambda r: (r["path"], r["length"], r["batch_size"])  # noqa: E731
+    base = {key(r): r for r in baseline["results"]}
+    regressions = []
+    for row in current["results"]:
+        old = base.get(key(row))
+        if old is None:
+            continue
+        if row.get("fallbacks", 0) > old.get("fallbacks", 0):
+            regressions.append(f"{key(row)} {row['fallbacks']} calls fell back to the local model")
+        if row["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{key(row)} p95 {old['p95_ms']:.2f}ms -> {row['p95_ms']:.2f}ms")
+        if row["reviews_per_sec"] < old["reviews_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{key(row)} throughput {old['reviews_per_sec']:.0f}/s -> {row['reviews_per_sec']:.0f}/s"
+            )
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark sentiment inference paths")
+    parser.add_argument("--paths", default=",".join(PATHS), help="Comma-separated subset of: local,cache,llm")
+    parser.add_argument("--batch-sizes", default="1,10,100,1000,10000")
+    parser.add_argument("--lengths", default=",".join(REVIEW_LENGTHS), help="Comma-separated subset of: short,medium,long")
+    parser.add_argument("--llm-max-batch", type=int, default=1000,
+                        help="Largest batch size run against the mock LLM (bigger ones are slow by design)")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0, help="Mean mock Groq response latency")
+    parser.add_argument("--llm-jitter-ms", type=float, default=50.0, help="Uniform +/- jitter on the mock latency")
+    parser.add_argument("--min-iterations", type=int, default=5)
+    parser.add_argument("--max-iterations", type=int, default=200)
+    parser.add_argument("--min-time", type=float, default=2.0, help="Seconds to keep sampling each case")
+    parser.add_argument("--model-path", type=Path, default=None, help="Compact model dir for the local path")
+    parser.add_argument("--out", type=Path, default=Path("bench_sentiment.json"))
+    parser.add_argument("--baseline", type=Path, default=None, help="Previous results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown before flagging")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    paths = [p for p in args.paths.split(",") if p]
+    lengths = [length for length in args.lengths.split(",") if length]
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",") if b]
+
+    with MockGroqServer(latency_ms=args.llm_latency_ms, jitter_ms=args.llm_jitter_ms) as mock:
+        os.environ["GROQ_BASE_URL"] = mock.url
+        os.environ.setdefault("GROQ_API_KEY", "mock")
+        if args.model_path is not None:
+            os.environ["SENTIMENT_MODEL_PATH"] = str(args.model_path)
+        from core import sentiment
+
+        sentiment.result_cache.maxsize = max(sentiment.result_cache.maxsize, max(batch_sizes))
+        results, skipped = [], []
+        for path in paths:
+            if path == "local" and not sentiment.LOCAL_MODEL_PATH.exists():
+                skipped.append({"path": path, "reason": f"no compact model at {sentiment.LOCAL_MODEL_PATH}"})
+                continue
+            for length in lengths:
+                for batch_size in batch_sizes:
+                    if path == "llm" and batch_size > args.llm_max_batch:
+                        skipped.append({"path": path, "length": length, "batch_size": batch_size,
+                                        "reason": "above --llm-max-batch"})
+                        continue
+                    row = run_case(sentiment, path, length, batch_size, args)
+                    results.append(row)
+                    print(
+                        f"{path:5} {length:6} batch={batch_size:<6} p50={row['p50_ms']:9.2f}ms "
+                        f"p95={row['p95_ms']:9.2f}ms p99={row['p99_ms']:9.2f}ms "
+                        f"{row['reviews_per_sec']:12.0f} reviews/s errors={row['errors']} "
+                        f"fallbacks={row['fallbacks']}"
+                    )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+    args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Results written to {args.out}")
+
+    if args.baseline is not None:
+        regressions = compare(report, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Lazily initialised provider clients, models and indexes.
+
+Modules register a factory under a name at import time; nothing heavy (SDK
+imports, API clients, model files) is touched until the first ``get``. Every
+initialisation is timed, and together with the phases ``main.py`` records
+while importing, it forms the startup breakdown exported on ``/metrics``.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from .metrics import REGISTRY, Gauge
+
+logger = logging.getLogger(__name__)
+
+STARTUP_SECONDS = REGISTRY.register(Gauge(
+    "startup_phase_seconds", "Time spent in each import/initialisation phase.", ("phase",)))
+
+
+class ComponentRegistry:
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self.timings: Dict[str, float] = {}
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        self._factories[name] = factory
+
+    def record(self, phase: str, seconds: float) -> None:
+        self.timings[phase] = seconds
+        STARTUP_SECONDS.set(seconds, phase=phase)
+
+    def get(self, name: str) -> Any:
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._instances:
+                start = time.perf_counter()
+                self._instances[name] = self._factories[name]()
+                self.record(f"init:{name}", time.perf_counter() - start)
+            return self._instances[name]
+
+    def loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def reset(self, name: str) -> None:
+        with self._lock:
+            self._instances.pop(name, None)
+
+    def preload(self, names: Optional[Iterable[str]] = None) -> Dict[str, Optional[str]]:
+        """Initialise components up front (e.g. before forking); returns name -> error."""
+        errors: Dict[str, Optional[str]] = {}
+        for name in names if names is not None else list(self._factories):
+            try:
+                self.get(name)
+                errors[name] = None
+            except Exception as e:
+                logger.warning(f"Could not preload {name}: {e}")
+                errors[name] = str(e)
+        return errors
+
+
+components = ComponentRegistry()
@@ -0,0 +1,337 @@
+"""
+Persistent queue and worker pool for bulk sentiment jobs.
+
+A job is a row in ``jobs`` plus one row per review in ``items``, both in a
+local SQLite file, so submissions, progress and results survive restarts.
+Worker threads claim a queued job, feed its unfinished reviews to
+``analyze_batch`` a chunk at a time and commit each chunk's results before
+taking the next. A running job holds a lease renewed after every chunk. When
+a server restarts, jobs left by its dead process are requeued at once, and
+jobs left by other hosts are requeued when their lease expires. Either way
+work resumes from the first unfinished review. Cancelling a job flips its
+status; the worker notices at the next chunk boundary. The optional drain rate
+is booked in the same database, so it holds across every thread and server
+process sharing the file.
+"""
+
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from .metrics import REGISTRY, Counter
+
+logger = logging.getLogger(__name__)
+
+JOBS_DB_PATH = Path(os.getenv("JOBS_DB_PATH", Path(__file__).resolve().parents[2] / "jobs.sqlite3"))
+TERMINAL = ("completed", "cancelled", "failed")
+
+JOB_REVIEWS = REGISTRY.register(Counter(
+    "sentiment_job_reviews_total", "Reviews processed by bulk jobs.", ("result",)))
+JOBS_FINISHED = REGISTRY.register(Counter(
+    "sentiment_jobs_finished_total", "Bulk jobs reaching a final state.", ("status",)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    processed INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    worker TEXT,
+    lease_until REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS items (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    review TEXT NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    label TEXT,
+    score REAL,
+    error TEXT,
+    PRIMARY KEY (job_id, idx)
+) WITHOUT ROWID;
+-- earliest wall-clock time the next chunk may start, shared by all workers
+CREATE TABLE IF NOT EXISTS pacing (
+    name TEXT PRIMARY KEY,
+    next_at REAL NOT NULL
+);
+"""
+
+_STATUS_COLUMNS = "id, status, total, processed, errors, created_at, updated_at, error"
+
+
+def _status_row(row) -> Dict:
+    keys = ["job_id", "status", "total", "processed", "errors", "created_at", "updated_at", "error"]
+    return dict(zip(keys, row))
+
+
+class JobStore:
+    def __init__(self, path: Path = JOBS_DB_PATH, lease_seconds: float = 120.0):
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # autocommit mode; writes use explicit transactions below
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def submit(self, reviews: List[str]) -> Dict:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, total, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, len(reviews), now, now),
+            )
+            conn.executemany("INSERT INTO items (job_id, idx, review) VALUES (?, ?, ?)",
+                             ((job_id, i, rev) for i, rev in enumerate(reviews)))
+            if not reviews:
+                conn.execute("UPDATE jobs SET status = 'completed' WHERE id = ?", (job_id,))
+        return self.status(job_id)
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(f"SELECT {_STATUS_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _status_row(row) if row else None
+
+    def results(self, job_id: str, offset: int, limit: int) -> List[Dict]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT review, label, score, error FROM items WHERE job_id = ? AND done = 1 AND idx >= ? "
+                "ORDER BY idx LIMIT ?",
+                (job_id, offset, limit),
+            ).fetchall()
+        return [{"review": r[0], "label": r[1], "score": r[2], "error": r[3]} for r in rows]
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', updated_at = ?, lease_until = NULL "
+                "WHERE id = ? AND status IN ('queued', 'running')",
+                (time.time(), job_id),
+            )
+        return self.status(job_id)
+
+    def claim(self, worker: str) -> Optional[str]:
+        """Take the oldest queued job, or a running one whose lease has expired."""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' OR (status = 'running' AND lease_until < ?) "
+                "ORDER BY created_at LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, updated_at = ? WHERE id = ?",
+                (worker, now + self.lease_seconds, now, row[0]),
+            )
+        return row[0]
+
+    def requeue_orphans(self, is_dead: Callable[[str], bool]) -> int:
+        """Requeue running jobs whose worker ``is_dead`` says is gone."""
+        with self._transaction() as conn:
+            rows = conn.execute("SELECT id, worker FROM jobs WHERE status = 'running'").fetchall()
+            orphans = [job_id for job_id, worker in rows if worker and is_dead(worker)]
+            conn.executemany("UPDATE jobs SET status = 'queued', worker = NULL, lease_until = NULL WHERE id = ?",
+                             ((job_id,) for job_id in orphans))
+        return len(orphans)
+
+    def next_chunk(self, job_id: str, size: int) -> List[tuple]:
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT idx, review FROM items WHERE job_id = ? AND done = 0 ORDER BY idx LIMIT ?",
+                (job_id, size),
+            ).fetchall()
+
+    def renew(self, job_id: str, worker: str) -> bool:
+        """Extend the lease; False once the job was cancelled or taken over."""
+        with self._transaction() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND status = 'running' AND worker = ?",
+                (time.time() + self.lease_seconds, job_id, worker),
+            )
+        return cur.rowcount == 1
+
+    def save_chunk(self, job_id: str, worker: str, indices: List[int], results: List[Dict]) -> bool:
+        """Store one chunk's results; returns False (and stores nothing) if the job is no longer ours."""
+        errors = sum(1 for r in results if r.get("error"))
+        now = time.time()
+        with self._transaction() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET processed = processed + ?, errors = errors + ?, updated_at = ?, lease_until = ? "
+                "WHERE id = ? AND status = 'running' AND worker = ?",
+                (len(indices), errors, now, now + self.lease_seconds, job_id, worker),
+            )
+            if cur.rowcount != 1:
+                return False
+            conn.executemany(
+                "UPDATE items SET done = 1, label = ?, score = ?, error = ? WHERE job_id = ? AND idx = ?",
+                ((r.get("label"), r.get("score"), r.get("error"), job_id, i) for i, r in zip(indices, results)),
+            )
+        return True
+
+    def reserve(self, reviews: int, per_second: float) -> float:
+        """Book ``reviews`` against the shared drain rate; returns seconds to wait first."""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT next_at FROM pacing WHERE name = 'jobs'").fetchone()
+            start = max(now, row[0]) if row else now
+            conn.execute("INSERT OR REPLACE INTO pacing (name, next_at) VALUES ('jobs', ?)",
+                         (start + reviews / per_second,))
+        return start - now
+
+    def release(self, job_id: str, worker: str) -> None:
+        """Put a job back in the queue, e.g. when its worker shuts down mid-job."""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL, lease_until = NULL "
+                "WHERE id = ? AND status = 'running' AND worker = ?",
+                (job_id, worker),
+            )
+
+    def finish(self, job_id: str, worker: str, status: str, error: Optional[str] = None) -> None:
+        with self._transaction() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ?, lease_until = NULL "
+                "WHERE id = ? AND status = 'running' AND worker = ?",
+                (status, error, time.time(), job_id, worker),
+            )
+        if cur.rowcount == 1:
+            JOBS_FINISHED.inc(status=status)
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _is_dead_local_worker(worker: str) -> bool:
+    host, _, rest = worker.partition(":")
+    pid = rest.partition(":")[0]
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+    return False
+
+
+class JobWorkerPool:
+    """Threads draining the job queue at a bounded rate.
+
+    ``reviews_per_second`` (0 = unlimited) paces chunks so bulk jobs leave
+    upstream quota for interactive requests. It is the total for every pool
+    using the same database, not per thread or per process. A chunk whose every
+    review failed is retried after a backoff, up to ``chunk_attempts`` times,
+    instead of filling the job with errors during a provider outage.
+    """
+
+    def __init__(self, store: JobStore, analyze: Callable[[List[str]], List[Dict]], workers: int = 2,
+                 chunk_size: int = 100, reviews_per_second: float = 0.0, poll_interval: float = 1.0,
+                 chunk_attempts: int = 3, backoff: float = 5.0):
+        self.store = store
+        self.analyze = analyze
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.reviews_per_second = reviews_per_second
+        self.poll_interval = poll_interval
+        self.chunk_attempts = chunk_attempts
+        self.backoff = backoff
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        requeued = self.store.requeue_orphans(_is_dead_local_worker)
+        if requeued:
+            logger.info(f"Requeued {requeued} job(s) interrupted by a restart")
+        self._stop.clear()
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._run, args=(f"{_worker_id()}:{n}",),
+                                      name=f"sentiment-job-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop after the current chunk; unfinished jobs resume on the next start."""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def _run(self, worker: str) -> None:
+        while not self._stop.is_set():
+            try:
+                job_id = self.store.claim(worker)
+                if job_id is None:
+                    self._wake.wait(self.poll_interval)
+                    self._wake.clear()
+                    continue
+                self._process(job_id, worker)
+            except Exception:
+                logger.exception("Sentiment job worker error")
+                self._stop.wait(self.poll_interval)
+
+    def _process(self, job_id: str, worker: str) -> None:
+        attempts = 0
+        while not self._stop.is_set():
+            chunk = self.store.next_chunk(job_id, self.chunk_size)
+            if not chunk:
+                self.store.finish(job_id, worker, "completed")
+                return
+            indices = [idx for idx, _ in chunk]
+            if self.reviews_per_second > 0:
+                self._stop.wait(self.store.reserve(len(chunk), self.reviews_per_second))
+                if self._stop.is_set():
+                    break
+            try:
+                results = self.analyze([review for _, review in chunk])
+            except Exception as e:
+                self.store.finish(job_id, worker, "failed", error=str(e))
+                return
+            if all(r.get("error") for r in results) and attempts + 1 < self.chunk_attempts:
+                attempts += 1
+                self._stop.wait(self.backoff * 2 ** (attempts - 1))
+                if not self.store.renew(job_id, worker):
+                    return
+                continue
+            attempts = 0
+            if not self.store.save_chunk(job_id, worker, indices, results):
+                return  # cancelled (or lease lost) while the chunk was running
+            failed = sum(1 for r in results if r.get("error"))
+            JOB_REVIEWS.inc(len(results) - failed, result="ok")
+            JOB_REVIEWS.inc(failed, result="error")
+        self.store.release(job_id, worker)
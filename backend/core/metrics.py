@@ -0,0 +1,311 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format.
+
+Only the standard library is used. Counters, gauges and histograms are keyed by
+label values and guarded by one lock per metric. ``stage()`` times a section of
+the hot path and tags it with the endpoint of the request currently being
+served, which ``MetricsMiddleware`` keeps in a context variable.
+"""
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Per-request scratch space shared between the middleware and the handler
+_request_ctx: ContextVar[Optional[dict]] = ContextVar("request_ctx", default=None)
+# HTTP attempts made inside the current ``upstream()`` block
+_attempts: ContextVar[Optional[List[int]]] = ContextVar("upstream_attempts", default=None)
+
+
+def _fmt(value: float) -> str:
+    value = float(value)
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, doc, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # key -> [bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+                    break
+            row[-2] += value
+            row[-1] += 1
+
+    def count(self, **labels) -> float:
+        row = self._values.get(self._key(labels))
+        return row[-1] if row else 0.0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        lines = self.header()
+        for key, row in items:
+            cumulative = 0.0
+            for bound, n in zip(self.buckets, row):
+                cumulative += n
+                le = 'le="%s"' % _fmt(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {_fmt(cumulative)}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {repr(row[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {_fmt(row[-1])}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    "api_request_duration_seconds", "End-to-end request latency.", ("endpoint", "method", "status")))
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    "api_stage_duration_seconds", "Latency of individual hot-path stages.", ("endpoint", "stage")))
+IN_FLIGHT = REGISTRY.register(Gauge(
+    "api_requests_in_flight", "Requests currently inside a route handler.", ("endpoint",)))
+BATCH_SIZE = REGISTRY.register(Histogram(
+    "api_batch_size", "Number of items per batch request.", ("endpoint",), buckets=SIZE_BUCKETS))
+UPSTREAM_LATENCY = REGISTRY.register(Histogram(
+    "upstream_request_duration_seconds", "Latency of upstream LLM calls.", ("provider", "operation")))
+UPSTREAM_ERRORS = REGISTRY.register(Counter(
+    "upstream_errors_total", "Failed upstream LLM calls.", ("provider", "error")))
+UPSTREAM_RETRIES = REGISTRY.register(Counter(
+    "upstream_retries_total", "Upstream HTTP attempts beyond the first per call.", ("provider",)))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "sentiment_cache_lookups_total", "Sentiment result cache lookups.", ("result",)))
+
+
+def current_endpoint() -> str:
+    ctx = _request_ctx.get()
+    return ctx["endpoint"] if ctx else "none"
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a hot-path stage under the current request's endpoint."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - start, endpoint=current_endpoint(), stage=name)
+
+
+@contextmanager
+def upstream(provider: str, operation: str) -> Iterator[None]:
+    """Time an upstream call and count its failures and retried attempts."""
+    attempts = [0]
+    token = _attempts.set(attempts)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        UPSTREAM_ERRORS.inc(provider=provider, error=type(e).__name__)
+        raise
+    finally:
+        UPSTREAM_LATENCY.observe(time.perf_counter() - start, provider=provider, operation=operation)
+        _attempts.reset(token)
+        if attempts[0] > 1:
+            UPSTREAM_RETRIES.inc(attempts[0] - 1, provider=provider)
+
+
+@contextmanager
+def request_thread() -> Iterator[None]:
+    """Mark the calling thread as working for the current request.
+
+    Blocking work runs on thread pools while the event-loop thread waits; the
+    slow-request profiler samples the threads registered here.
+    """
+    ctx = _request_ctx.get()
+    if ctx is None:
+        yield
+        return
+    tid = threading.get_ident()
+    threads = ctx["threads"]
+    threads[tid] = threads.get(tid, 0) + 1
+    try:
+        yield
+    finally:
+        threads[tid] -= 1
+        if not threads[tid]:
+            del threads[tid]
+
+
+def in_request_thread(fn):
+    """Wrap ``fn`` for ``run_in_threadpool`` so the worker thread counts as the request's."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with request_thread():
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def count_attempt(_request=None) -> None:
+    """httpx request hook: one call per HTTP attempt, including SDK retries."""
+    attempts = _attempts.get()
+    if attempts is not None:
+        attempts[0] += 1
+
+
+def _route_label(scope, default: str) -> str:
+    """Route template (``/sentiment/jobs/{job_id}``) so path parameters don't become labels."""
+    route = scope.get("route")
+    return getattr(route, "path", default)
+
+
+def instrumented(handler):
+    """Wrap an async route handler to time request parsing and the handler body.
+
+    Parsing covers everything between the request arriving and the handler
+    being called (body read + Pydantic request validation).
+    """
+    @functools.wraps(handler)
+    async def wrapper(*args, **kwargs):
+        ctx = _request_ctx.get()
+        if ctx is None:
+            return await handler(*args, **kwargs)
+        ctx["endpoint"] = _route_label(ctx["scope"], ctx["endpoint"])
+        ctx["handler_start"] = time.perf_counter()
+        STAGE_LATENCY.observe(ctx["handler_start"] - ctx["start"], endpoint=ctx["endpoint"], stage="parse")
+        IN_FLIGHT.inc(endpoint=ctx["endpoint"])
+        try:
+            return await handler(*args, **kwargs)
+        finally:
+            IN_FLIGHT.dec(endpoint=ctx["endpoint"])
+            ctx["handler_end"] = time.perf_counter()
+            STAGE_LATENCY.observe(ctx["handler_end"] - ctx["handler_start"], endpoint=ctx["endpoint"], stage="handler")
+    return wrapper
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request and its response phase."""
+
+    def __init__(self, app, on_request_start=None, on_request_end=None):
+        self.app = app
+        self.on_request_start = on_request_start
+        self.on_request_end = on_request_end
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        endpoint = scope.get("path", "")
+        # "threads": pool threads working for the request (see request_thread)
+        ctx = {"endpoint": endpoint, "start": time.perf_counter(), "thread": threading.get_ident(),
+               "threads": {}, "scope": scope}
+        token = _request_ctx.set(ctx)
+        status = {"code": 500}
+        if self.on_request_start is not None:
+            self.on_request_start(ctx)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                # Response model validation + serialization happen after the handler returns
+                if "handler_end" in ctx:
+                    STAGE_LATENCY.observe(time.perf_counter() - ctx["handler_end"], endpoint=ctx["endpoint"], stage="response")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - ctx["start"]
+            # Unknown paths share one label so scanners can't blow up cardinality
+            if "route" in scope:
+                label = _route_label(scope, endpoint)
+            else:
+                label = endpoint if status["code"] != 404 else "unmatched"
+            REQUEST_LATENCY.observe(elapsed, endpoint=label, method=scope.get("method", ""), status=status["code"])
+            if self.on_request_end is not None:
+                self.on_request_end(ctx, elapsed)
+            _request_ctx.reset(token)
@@ -0,0 +1,112 @@
+"""
+Sampling profiler for slow requests, switchable at runtime.
+
+While enabled, a daemon thread periodically grabs the Python stack of every
+thread that is serving a request (``sys._current_frames``) and counts the
+collapsed stacks per request. Requests that end up slower than the threshold
+keep their samples in a small ring buffer, in the ``a;b;c count`` format that
+flamegraph tools read. While a request has blocking work on pool threads
+(registered through ``metrics.request_thread``) those threads are sampled;
+otherwise its event-loop thread is. Handlers share the event-loop thread, so
+those samples are attributed to every request overlapping at the time.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, List, Optional
+
+MAX_DEPTH = 64
+
+
+def _collapse(frame) -> str:
+    parts: List[str] = []
+    while frame is not None and len(parts) < MAX_DEPTH:
+        code = frame.f_code
+        parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+class SlowRequestProfiler:
+    def __init__(self, slow_ms: float = 1000.0, interval_ms: float = 5.0, keep: int = 20, top: int = 50):
+        self.slow_ms = slow_ms
+        self.interval_ms = interval_ms
+        self.top = top
+        self.captured: deque = deque(maxlen=keep)
+        self._active: Dict[int, dict] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def configure(self, enabled: bool, slow_ms: Optional[float] = None, interval_ms: Optional[float] = None,
+                  keep: Optional[int] = None) -> None:
+        if slow_ms is not None:
+            self.slow_ms = slow_ms
+        if interval_ms is not None:
+            self.interval_ms = interval_ms
+        if keep is not None:
+            self.captured = deque(self.captured, maxlen=keep)
+        if enabled and not self.enabled:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+            self._thread.start()
+        elif not enabled and self.enabled:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            with self._lock:
+                self._active.clear()
+
+    # Hooks called by MetricsMiddleware
+    def request_started(self, ctx: dict) -> None:
+        if self.enabled:
+            with self._lock:
+                self._active[id(ctx)] = {"ctx": ctx, "samples": Counter()}
+
+    def request_finished(self, ctx: dict, elapsed: float) -> None:
+        with self._lock:
+            entry = self._active.pop(id(ctx), None)
+        if entry is None or elapsed * 1000 < self.slow_ms:
+            return
+        self.captured.append({
+            "endpoint": ctx["endpoint"],
+            "duration_ms": elapsed * 1000,
+            "finished_at": time.time(),
+            "samples": sum(entry["samples"].values()),
+            "stacks": [f"{stack} {n}" for stack, n in entry["samples"].most_common(self.top)],
+        })
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval_ms / 1000):
+            frames = sys._current_frames()
+            with self._lock:
+                active = list(self._active.values())
+            stacks: Dict[int, str] = {}
+            for entry in active:
+                ctx = entry["ctx"]
+                # the event loop only sits in select() while pool threads work
+                for tid in tuple(ctx["threads"]) or (ctx["thread"],):
+                    if tid == me or tid not in frames:
+                        continue
+                    if tid not in stacks:
+                        stacks[tid] = _collapse(frames[tid])
+                    entry["samples"][stacks[tid]] += 1
+
+    def status(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "slow_ms": self.slow_ms,
+            "interval_ms": self.interval_ms,
+            "captured": list(self.captured),
+        }
+
+
+profiler = SlowRequestProfiler()
@@ -0,0 +1,282 @@
+"""
+Hedged requests, circuit breaking and retry budgets for upstream LLM calls.
+
+Every provider gets one ``ResiliencePolicy``. A call through the policy:
+
+1. fails fast with ``CircuitOpenError`` while the provider's breaker is open,
+   so callers can answer from a local model or cache instead of waiting;
+2. runs the call on a worker thread and, if it has not answered by the recent
+   p95 latency for that operation, fires one duplicate (a hedge) and returns
+   whichever succeeds first;
+3. retries transient failures with jittered backoff.
+
+Hedges and retries both draw from a per-provider retry budget: a fixed
+trickle plus a share of recent first attempts. When the provider is down,
+extra attempts therefore stay a small fraction of normal traffic instead of
+multiplying it. The SDKs' own retries are disabled so the budget sees them all.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional
+
+from .metrics import REGISTRY, UPSTREAM_RETRIES, Counter, Gauge, request_thread, upstream
+
+UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT_SECONDS", "30"))
+HEDGING_ENABLED = os.getenv("UPSTREAM_HEDGING", "1") == "1"
+
+EVENTS = REGISTRY.register(Counter(
+    "upstream_resilience_events_total",
+    "Hedges, retries, short circuits and fallbacks per provider.", ("provider", "event")))
+CIRCUIT_STATE = REGISTRY.register(Gauge(
+    "upstream_circuit_state", "Breaker state per provider (0 closed, 1 half-open, 2 open).", ("provider",)))
+
+_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"{provider} is unavailable (circuit open, retry in {retry_after:.0f}s)")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Client errors (bad request, auth) will not succeed on another attempt."""
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    if isinstance(status, int) and 400 <= status < 500:
+        return status in (408, 409, 429)
+    return True
+
+
+class LatencyTracker:
+    """Rolling window of successful attempt durations for one operation."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class RetryBudget:
+    """Allow ``min_per_second * window`` extra attempts plus ``ratio`` of recent calls."""
+
+    def __init__(self, ratio: float = 0.1, min_per_second: float = 0.5, window: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window = window
+        self._calls: Deque[float] = deque()
+        self._spent: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float) -> None:
+        for q in (self._calls, self._spent):
+            while q and now - q[0] > self.window:
+                q.popleft()
+
+    def deposit(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            self._calls.append(now)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            if len(self._spent) < self.min_per_second * self.window + self.ratio * len(self._calls):
+                self._spent.append(now)
+                return True
+            return False
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; lets one probe through after ``reset_after``.
+
+    A probe that reports no outcome within ``probe_timeout`` is treated as lost
+    and its slot is handed to the next caller, so a probe that never finishes
+    cannot keep the provider blocked.
+    """
+
+    def __init__(self, provider: str, failure_threshold: int = 5, reset_after: float = 30.0,
+                 probe_timeout: float = UPSTREAM_TIMEOUT):
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.probe_timeout = probe_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.set(0, provider=provider)
+
+    def _set(self, state: str) -> None:
+        self.state = state
+        CIRCUIT_STATE.set(_STATE_VALUES[state], provider=self.provider)
+
+    def check(self, claim: bool = True) -> bool:
+        """Raise ``CircuitOpenError`` unless a call may go through now.
+
+        Returns True if this call took the half-open probe slot. With
+        ``claim=False`` the slot is only tested, never taken.
+        """
+        with self._lock:
+            if self.state == "closed":
+                return False
+            now = time.monotonic()
+            remaining = self.opened_at + self.reset_after - now
+            if self.state == "open" and remaining <= 0:
+                self._set("half_open")
+            if self.state == "half_open":
+                if self._probing and now - self._probe_started > self.probe_timeout:
+                    self._probing = False
+                if not self._probing:
+                    if claim:
+                        self._probing = True
+                        self._probe_started = now
+                    return claim
+                remaining = self._probe_started + self.probe_timeout - now
+            raise CircuitOpenError(self.provider, max(remaining, 0.0))
+
+    def release(self) -> None:
+        """Give back the half-open probe slot taken by ``check`` without recording an outcome."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            if self.state != "closed":
+                self._set("closed")
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._set("open")
+
+
+class ResiliencePolicy:
+    def __init__(self, provider: str, max_retries: int = 2, backoff: float = 0.25,
+                 hedge_quantile: float = 0.95, min_hedge_delay: float = 0.05,
+                 breaker: Optional[CircuitBreaker] = None, budget: Optional[RetryBudget] = None,
+                 max_workers: int = 32):
+        self.provider = provider
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.hedge_quantile = hedge_quantile
+        self.min_hedge_delay = min_hedge_delay
+        self.breaker = breaker or CircuitBreaker(provider)
+        self.budget = budget or RetryBudget()
+        self.latency: Dict[str, LatencyTracker] = {}
+        # attempts (primary + hedge) and the callers waiting on them; kept off
+        # asyncio's default executor, which is only cpu_count + 4 threads
+        self._pool = ThreadPoolExecutor(max_workers=2 * max_workers, thread_name_prefix=f"{provider}-upstream")
+        self._callers = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{provider}-caller")
+
+    def hedge_delay(self, operation: str) -> Optional[float]:
+        if not HEDGING_ENABLED:
+            return None
+        p = self.latency.setdefault(operation, LatencyTracker()).quantile(self.hedge_quantile)
+        return None if p is None else max(p, self.min_hedge_delay)
+
+    def _submit(self, operation: str, fn: Callable[[], Any]):
+        tracker = self.latency.setdefault(operation, LatencyTracker())
+
+        def attempt():
+            start = time.perf_counter()
+            with request_thread(), upstream(self.provider, operation):
+                result = fn()
+            tracker.observe(time.perf_counter() - start)
+            return result
+
+        # each attempt gets its own copy so request-scoped metrics follow it
+        return self._pool.submit(contextvars.copy_context().run, attempt)
+
+    def _hedged(self, operation: str, fn: Callable[[], Any]) -> Any:
+        primary = self._submit(operation, fn)
+        pending = {primary}
+        delay = self.hedge_delay(operation)
+        if delay is not None and not wait(pending, timeout=delay).done:
+            if self.budget.withdraw():
+                EVENTS.inc(provider=self.provider, event="hedge")
+                UPSTREAM_RETRIES.inc(provider=self.provider)
+                pending.add(self._submit(operation, fn))
+            else:
+                EVENTS.inc(provider=self.provider, event="budget_exhausted")
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        EVENTS.inc(provider=self.provider, event="hedge_won")
+                    # a slower duplicate is left to finish in the background
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def call(self, operation: str, fn: Callable[[], Any]) -> Any:
+        """Run ``fn`` (a blocking SDK call) under the breaker, hedging and retry budget."""
+        try:
+            self.breaker.check()
+        except CircuitOpenError:
+            EVENTS.inc(provider=self.provider, event="short_circuit")
+            raise
+        self.budget.deposit()
+        retries = 0
+        while True:
+            try:
+                result = self._hedged(operation, fn)
+            except Exception as e:
+                if not is_transient(e):
+                    # the provider answered; the request itself is bad
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if retries >= self.max_retries or self.breaker.state != "closed":
+                    raise
+                if not self.budget.withdraw():
+                    EVENTS.inc(provider=self.provider, event="budget_exhausted")
+                    raise
+                retries += 1
+                EVENTS.inc(provider=self.provider, event="retry")
+                UPSTREAM_RETRIES.inc(provider=self.provider)
+                time.sleep(self.backoff * 2 ** (retries - 1) * random.uniform(0.5, 1.5))
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def acall(self, operation: str, fn: Callable[[], Any]) -> Any:
+        """``call`` for async handlers, without blocking the event loop."""
+        ctx = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._callers, functools.partial(ctx.run, self.call, operation, fn))
+
+
+groq_policy = ResiliencePolicy("groq")
+# Gemini calls are several times slower; hedge a little later
+gemini_policy = ResiliencePolicy("gemini", min_hedge_delay=0.5)
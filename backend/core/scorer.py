@@ -0,0 +1,193 @@
+"""
+Lightweight scorer for the compact sentiment artifact written by
+``pipeline/export.py``.
+
+Only numpy and the standard library are needed at serving time. The arrays are
+memory-mapped read-only, so every worker process shares the same pages and
+startup is a handful of ``open`` calls instead of unpickling sklearn objects.
+The maths mirrors ``TfidfVectorizer`` + ``LogisticRegression.predict_proba``
+step by step (including summation order) so the probabilities match the
+original pipeline.
+"""
+
+import json
+import math
+import re
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Sequence, Union
+
+import numpy as np
+
+META_FILE = "meta.json"
+FORMAT_VERSION = 1
+
+
+def _strip_accents_unicode(s: str) -> str:
+    try:
+        s.encode("ASCII", errors="strict")
+        return s
+    except UnicodeEncodeError:
+        normalized = unicodedata.normalize("NFKD", s)
+        return "".join([c for c in normalized if not unicodedata.combining(c)])
+
+
+def _strip_accents_ascii(s: str) -> str:
+    nkfd_form = unicodedata.normalize("NFKD", s)
+    return nkfd_form.encode("ASCII", "ignore").decode("ASCII")
+
+
+_ACCENT_FUNCS = {
+    None: None,
+    "unicode": _strip_accents_unicode,
+    "ascii": _strip_accents_ascii,
+}
+
+
+def _expit(x: np.ndarray) -> np.ndarray:
+    # libm exp (as used by scipy.special.expit) rather than numpy's SIMD exp,
+    # which can differ in the last ulp
+    flat = [1.0 / (1.0 + math.exp(-v)) for v in x.ravel().tolist()]
+    return np.array(flat, dtype=np.float64).reshape(x.shape)
+
+
+class CompactScorer:
+    """TF-IDF + logistic regression scorer backed by memory-mapped arrays."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        meta = json.loads((self.path / META_FILE).read_text(encoding="utf-8"))
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported artifact version in {self.path}: {meta.get('format_version')}")
+
+        self.classes = list(meta["classes"])
+        self.ovr = bool(meta["ovr"])
+        self.lowercase = bool(meta["lowercase"])
+        self.binary = bool(meta["binary"])
+        self.sublinear_tf = bool(meta["sublinear_tf"])
+        self.norm = meta["norm"]
+        self.ngram_range = tuple(meta["ngram_range"])
+        self.stop_words = frozenset(meta["stop_words"] or ())
+        self._accent = _ACCENT_FUNCS[meta["strip_accents"]]
+        self._token_re = re.compile(meta["token_pattern"])
+
+        # Sorted vocabulary (fixed-width UTF-8) and the column of each term
+        self.terms = self._load("terms")
+        self.columns = self._load("columns")
+        self.idf = self._load("idf") if meta["use_idf"] else None
+        # coef is stored transposed: (n_features, n_rows) so gathers are contiguous
+        self.coef_t = self._load("coef_t")
+        self.intercept = self._load("intercept")
+        self._term_width = self.terms.dtype.itemsize
+
+    def _load(self, name: str) -> np.ndarray:
+        return np.load(self.path / f"{name}.npy", mmap_mode="r")
+
+    @property
+    def n_features(self) -> int:
+        return self.coef_t.shape[0]
+
+    # --- vectorizer ---------------------------------------------------------
+
+    def _analyze(self, doc: str) -> List[str]:
+        if self.lowercase:
+            doc = doc.lower()
+        if self._accent is not None:
+            doc = self._accent(doc)
+        tokens = self._token_re.findall(doc)
+        if self.stop_words:
+            tokens = [w for w in tokens if w not in self.stop_words]
+
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+        original = tokens
+        if min_n == 1:
+            tokens = list(original)
+            min_n += 1
+        else:
+            tokens = []
+        n_original = len(original)
+        for n in range(min_n, min(max_n + 1, n_original + 1)):
+            for i in range(n_original - n + 1):
+                tokens.append(" ".join(original[i : i + n]))
+        return tokens
+
+    def _lookup(self, tokens: Sequence[str]) -> np.ndarray:
+        """Map tokens to feature columns, dropping out-of-vocabulary terms."""
+        encoded = [t.encode("utf-8") for t in tokens]
+        encoded = [t for t in encoded if len(t) <= self._term_width]
+        if not encoded:
+            return np.empty(0, dtype=np.int64)
+        query = np.array(encoded, dtype=self.terms.dtype)
+        pos = np.searchsorted(self.terms, query)
+        pos[pos == len(self.terms)] = 0
+        hit = self.terms[pos] == query
+        return self.columns[pos[hit]].astype(np.int64)
+
+    def transform_one(self, doc: str):
+        """Return ``(columns, values)`` of the TF-IDF row for ``doc``, columns ascending."""
+        cols, counts = np.unique(self._lookup(self._analyze(doc)), return_counts=True)
+        values = counts.astype(np.float64)
+        if self.binary:
+            values[:] = 1.0
+        if self.sublinear_tf:
+            values = np.log(values) + 1.0
+        if self.idf is not None:
+            values = values * self.idf[cols]
+        if self.norm == "l2" and len(values):
+            norm = np.sqrt(np.cumsum(values * values)[-1])
+            if norm != 0.0:
+                values = values / norm
+        elif self.norm == "l1" and len(values):
+            norm = np.cumsum(np.abs(values))[-1]
+            if norm != 0.0:
+                values = values / norm
+        return cols, values
+
+    # --- classifier ---------------------------------------------------------
+
+    def decision_function(self, docs: Sequence[str]) -> np.ndarray:
+        out = np.empty((len(docs), self.coef_t.shape[1]), dtype=np.float64)
+        for i, doc in enumerate(docs):
+            cols, values = self.transform_one(doc)
+            if len(cols):
+                # Sequential accumulation in column order, like scipy's csr @ dense
+                out[i] = np.cumsum(values[:, None] * self.coef_t[cols], axis=0)[-1]
+            else:
+                out[i] = 0.0
+        out += self.intercept
+        return out[:, 0] if out.shape[1] == 1 else out
+
+    def predict_proba(self, docs: Sequence[str]) -> np.ndarray:
+        decision = self.decision_function(docs)
+        if self.ovr:
+            prob = _expit(decision)
+            if prob.ndim == 1:
+                return np.vstack([1 - prob, prob]).T
+            prob /= prob.sum(axis=1).reshape((prob.shape[0], -1))
+            return prob
+        if decision.ndim == 1:
+            decision = np.c_[-decision, decision]
+        decision = decision - decision.max(axis=1, keepdims=True)
+        exp = np.exp(decision)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict(self, docs: Sequence[str]) -> List[str]:
+        proba = self.predict_proba(docs)
+        return [self.classes[i] for i in proba.argmax(axis=1)]
+
+    def score(self, docs: Sequence[str]) -> List[Dict]:
+        """Label plus a compound-style score in [-1, 1] (P(positive) - P(negative))."""
+        proba = self.predict_proba(docs)
+        idx = {str(c).lower(): i for i, c in enumerate(self.classes)}
+        pos, neg = idx.get("positive"), idx.get("negative")
+        results = []
+        for doc, row in zip(docs, proba):
+            score = (row[pos] if pos is not None else 0.0) - (row[neg] if neg is not None else 0.0)
+            results.append({
+                "review": doc,
+                "label": str(self.classes[int(row.argmax())]).title(),
+                "score": float(score),
+            })
+        return results
@@ -1,32 +1,102 @@
-from typing import List, Dict
+import os
+from pathlib import Path
+from typing import List, Dict, Optional
 from .util.utill import groq_sentiment_batch, groq_sentiment_single
+from .util.cache import LRUCache
+from .scorer import CompactScorer
+from .metrics import CACHE_LOOKUPS, stage
+from .components import components
+from .resilience import EVENTS
+
+# Compact artifact exported by pipeline/export.py
+LOCAL_MODEL_PATH = Path(os.getenv(
+    "SENTIMENT_MODEL_PATH",
+    Path(__file__).resolve().parents[2] / "Models" / "logreg_sentiment",
+))
+components.register("sentiment_model", lambda: CompactScorer(LOCAL_MODEL_PATH))
+
+# LLM results keyed by review text; identical reviews skip the upstream call
+result_cache = LRUCache(maxsize=int(os.getenv("SENTIMENT_CACHE_SIZE", "10000")))
+
+
+def get_local_scorer() -> CompactScorer:
+    return components.get("sentiment_model")
 
 
 def analyze_single(review: str) -> Dict[str, float]:
-    result = groq_sentiment_single(review=review)
+    with stage("cache_lookup"):
+        cached = result_cache.get(review)
+    CACHE_LOOKUPS.inc(result="hit" if cached is not None else "miss")
+    if cached is not None:
+        return dict(cached)
+    try:
+        result = groq_sentiment_single(review=review)
+    except Exception as e:
+        fallback = _local_fallback([review], e)[0]
+        if fallback["error"]:
+            raise
+        return {"review": review, "label": fallback["label"], "score": fallback["score"]}
+    result_cache.put(review, result)
     return result
 
 def analyze_batch(reviews: List[str]) -> List[Dict]:
-    results: List[Dict] = []
-    for start in range(0, len(reviews), 25):
-        chunk = reviews[start : start + 25]
+    results: List[Optional[Dict]] = [None] * len(reviews)
+    pending: List[int] = []
+    with stage("cache_lookup"):
+        for i, rev in enumerate(reviews):
+            cached = result_cache.get(rev)
+            if cached is not None:
+                results[i] = {"review": rev, "label": cached.get("label"), "score": cached.get("score"), "error": None}
+            else:
+                pending.append(i)
+    CACHE_LOOKUPS.inc(len(reviews) - len(pending), result="hit")
+    CACHE_LOOKUPS.inc(len(pending), result="miss")
+
+    for start in range(0, len(pending), 25):
+        idx = pending[start : start + 25]
+        chunk = [reviews[i] for i in idx]
         try:
             batch_out = groq_sentiment_batch(chunk)
 
+            # The model may drop or reorder items, so match replies to inputs
+            # by the review number given in the prompt
+            unanswered = dict(enumerate(idx, 1))
             for item in batch_out:
-                results.append({
-                    "review": item.get("review"),
-                    "label": item.get("label"),
-                    "score": item.get("score"),
-                    "error": None
-                })
-
-        except Exception as e:
-            for rev in chunk:
-                results.append({
-                    "review": rev,
+                i = unanswered.pop(_reply_id(item), None)
+                if i is None:
+                    continue
+                rev = reviews[i]
+                results[i] = {"review": rev, "label": item.get("label"), "score": item.get("score"), "error": None}
+                result_cache.put(rev, {"review": rev, "label": item.get("label"), "score": item.get("score")})
+            for i in unanswered.values():
+                results[i] = {
+                    "review": reviews[i],
                     "label": None,
                     "score": None,
-                    "error": str(e)
-                })
+                    "error": "Missing from model response"
+                }
+
+        except Exception as e:
+            for i, item in zip(idx, _local_fallback(chunk, e)):
+                results[i] = item
     return results
+
+def _reply_id(item) -> Optional[int]:
+    """Review number of a batch reply, or None if it has no usable one."""
+    n = item.get("id") if isinstance(item, dict) else None
+    return int(n) if isinstance(n, (int, str)) and str(n).isdigit() else None
+
+def _local_fallback(reviews: List[str], error: Exception) -> List[Dict]:
+    """Score with the compact local model while Groq is failing (not cached)."""
+    if not LOCAL_MODEL_PATH.exists():
+        return [{"review": rev, "label": None, "score": None, "error": str(error)} for rev in reviews]
+    EVENTS.inc(provider="groq", event="fallback")
+    return analyze_local(reviews)
+
+def analyze_local(reviews: List[str]) -> List[Dict]:
+    try:
+        with stage("local_model"):
+            scored = get_local_scorer().score(reviews)
+    except Exception as e:
+        return [{"review": rev, "label": None, "score": None, "error": str(e)} for rev in reviews]
+    return [{**item, "error": None} for item in scored]
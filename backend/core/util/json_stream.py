@@ -0,0 +1,75 @@
+import json
+from typing import Any, Iterator, List
+
+_WHITESPACE = " \t\r\n"
+
+
+class JsonArrayStream:
+    """Incrementally parse a top-level JSON array fed in arbitrary text fragments.
+
+    ``feed`` returns every element completed by the new text, so each object in
+    ``[{...}, {...}]`` is available as soon as its closing brace arrives. Text
+    before the opening ``[`` (e.g. a code fence) is skipped.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0          # next character to scan
+        self._start = -1       # start of the element being read, -1 between elements
+        self._depth = 0        # nesting inside the current element
+        self._in_string = False
+        self._escaped = False
+        self.started = False
+        self.finished = False
+
+    def feed(self, text: str) -> List[Any]:
+        self._buf += text
+        return list(self._scan())
+
+    def _scan(self) -> Iterator[Any]:
+        while self._pos < len(self._buf) and not self.finished:
+            i = self._pos
+            ch = self._buf[i]
+            self._pos += 1
+            if not self.started:
+                self.started = ch == "["
+            elif self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 0:
+                        yield self._emit(i + 1)
+            elif self._start < 0:
+                # between elements
+                if ch == "]":
+                    self.finished = True
+                elif ch not in _WHITESPACE and ch != ",":
+                    self._start = i
+                    if ch in "{[":
+                        self._depth = 1
+                    elif ch == '"':
+                        self._in_string = True
+            elif self._depth > 0:
+                if ch == '"':
+                    self._in_string = True
+                elif ch in "{[":
+                    self._depth += 1
+                elif ch in "}]":
+                    self._depth -= 1
+                    if self._depth == 0:
+                        yield self._emit(i + 1)
+            elif ch in _WHITESPACE or ch in ",]":
+                # end of a number / true / false / null
+                yield self._emit(i)
+                self.finished = ch == "]"
+
+    def _emit(self, end: int) -> Any:
+        value = json.loads(self._buf[self._start:end])
+        # drop the consumed prefix so the buffer only holds the current element
+        self._buf = self._buf[end:]
+        self._pos -= end
+        self._start = -1
+        return value
@@ -1,10 +1,15 @@
 
 import os
 import asyncio
-from typing import List, Optional
-from google import genai
-from pydantic import BaseModel, Field
+import time
+from typing import AsyncIterator, List, Optional, Union
+from pydantic import BaseModel, Field, ValidationError
 from models.recommendation_model import Book
+from ..components import components
+from ..metrics import STAGE_LATENCY, UPSTREAM_ERRORS, UPSTREAM_LATENCY, current_endpoint
+from ..resilience import EVENTS, UPSTREAM_TIMEOUT, CircuitOpenError, gemini_policy, is_transient
+from .cache import LRUCache
+from .json_stream import JsonArrayStream
 from dotenv import load_dotenv
 import os
 
@@ -12,57 +17,173 @@ import os
 load_dotenv('../../.env')  
 # Pydantic models
 title_recommendation = List[str]
+# A full list, or the books one at a time when streaming
+Recommendations = Union[List[Book], AsyncIterator[Book]]
+
+def _make_gemini_client():
+    # SDK import deferred until the first recommendation
+    from google import genai
+    from google.genai import types
+
+    key = os.getenv('GEMINI_API_KEY')
+    if not key:
+        raise RuntimeError('Falied in Loading the model')
+    return genai.Client(api_key=key, http_options=types.HttpOptions(timeout=int(UPSTREAM_TIMEOUT * 1000)))
+
+components.register("gemini", _make_gemini_client)
+
+async def _replay(books: List[Book]) -> AsyncIterator[Book]:
+    for book in books:
+        yield book
 
 class BookRecommender:
     def __init__(self: Optional[str] = None):
-        key = os.getenv('GEMINI_API_KEY')
-        if not key:
-            raise RuntimeError('Falied in Loading the model')
-        self.client = genai.Client(api_key=key)
-
-    async def _generate(self, prompt: str, schema: type[list[Book]]) -> List[Book]:
-        response = self.client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-            config={
-                "response_mime_type": "application/json",
-                "response_schema": schema,
-            },
-        )
-        # blocking call; wrap in executor if needed
-        return response.parsed  # type: ignore
-
-    async def similar_books(self, query: str) -> List[Book]:
+        # Last good answer per prompt, served while Gemini is failing
+        self.fallback_cache = LRUCache(maxsize=int(os.getenv("RECOMMEND_FALLBACK_CACHE_SIZE", "1000")))
+
+    @property
+    def client(self):
+        return components.get("gemini")
+
+    async def _generate(self, prompt: str, schema: type[list[Book]],
+                        stream: bool = False) -> Recommendations:
+        if stream:
+            return self._stream(prompt, schema)
+
+        def call():
+            return self.client.models.generate_content(
+                model="gemini-2.5-flash",
+                contents=prompt,
+                config={
+                    "response_mime_type": "application/json",
+                    "response_schema": schema,
+                },
+            )
+
+        try:
+            # blocking SDK call, hedged and retried off the event loop
+            response = await gemini_policy.acall("generate_content", call)
+        except Exception:
+            cached = self.fallback_cache.get(prompt)
+            if cached is None:
+                raise
+            EVENTS.inc(provider="gemini", event="fallback")
+            return cached
+        parsed = response.parsed  # type: ignore
+        if parsed:
+            self.fallback_cache.put(prompt, parsed)
+        return parsed
+
+    def _short_circuit(self, prompt: str, error: CircuitOpenError) -> List[Book]:
+        EVENTS.inc(provider="gemini", event="short_circuit")
+        cached = self.fallback_cache.get(prompt)
+        if cached is None:
+            raise error
+        EVENTS.inc(provider="gemini", event="fallback")
+        return cached
+
+    def _stream(self, prompt: str, schema: type[list[Book]]) -> AsyncIterator[Book]:
+        # Checked before any response is started, so an open circuit with
+        # nothing cached still becomes a 503 rather than a broken stream. The
+        # probe slot itself is only taken once the stream runs: a generator
+        # that is never iterated never reaches the finally that gives it back.
+        try:
+            gemini_policy.breaker.check(claim=False)
+        except CircuitOpenError as e:
+            return _replay(self._short_circuit(prompt, e))
+        return self._stream_books(prompt, schema)
+
+    async def _stream_books(self, prompt: str, schema: type[list[Book]]) -> AsyncIterator[Book]:
+        """Yield each book as soon as its JSON object is complete in the streamed text."""
+        try:
+            probe = gemini_policy.breaker.check()
+        except CircuitOpenError as e:
+            # another request took the probe since _stream checked
+            for book in self._short_circuit(prompt, e):
+                yield book
+            return
+        gemini_policy.budget.deposit()
+        parser = JsonArrayStream()
+        books: List[Book] = []
+        start = time.perf_counter()
+        settled = False
+        try:
+            chunks = await self.client.aio.models.generate_content_stream(
+                model="gemini-2.5-flash",
+                contents=prompt,
+                config={
+                    "response_mime_type": "application/json",
+                    "response_schema": schema,
+                },
+            )
+            async for chunk in chunks:
+                for item in parser.feed(chunk.text or ""):
+                    try:
+                        book = Book.model_validate(item)
+                    except ValidationError:
+                        continue
+                    if not books:
+                        STAGE_LATENCY.observe(time.perf_counter() - start, endpoint=current_endpoint(),
+                                              stage="first_book")
+                    books.append(book)
+                    yield book
+        except Exception as e:
+            UPSTREAM_ERRORS.inc(provider="gemini", error=type(e).__name__)
+            settled = True
+            if is_transient(e):
+                gemini_policy.breaker.record_failure()
+            else:
+                gemini_policy.breaker.record_success()
+            cached = self.fallback_cache.get(prompt)
+            # after books went out, replaying the cached list would duplicate them
+            if books or cached is None:
+                raise
+            EVENTS.inc(provider="gemini", event="fallback")
+            for book in cached:
+                yield book
+        else:
+            settled = True
+            gemini_policy.breaker.record_success()
+            if books:
+                self.fallback_cache.put(prompt, books)
+        finally:
+            if not settled and probe:
+                # client went away mid-stream; don't leave our half-open probe claimed
+                gemini_policy.breaker.release()
+            UPSTREAM_LATENCY.observe(time.perf_counter() - start, provider="gemini",
+                                     operation="generate_content_stream")
+
+    async def similar_books(self, query: str, stream: bool = False) -> Recommendations:
         prompt = f"List books similar to '{query}' with title, author, genre, description"
-        return await self._generate(prompt, list[Book])
+        return await self._generate(prompt, list[Book], stream)
 
-    async def by_author(self, author: str) -> List[Book]:
+    async def by_author(self, author: str, stream: bool = False) -> Recommendations:
         prompt = f"List books written by author '{author}'"
-        return await self._generate(prompt, list[Book])
+        return await self._generate(prompt, list[Book], stream)
 
-    async def by_genre(self, genre: str) -> List[Book]:
+    async def by_genre(self, genre: str, stream: bool = False) -> Recommendations:
         prompt = f"Top books in the genre '{genre}'"
-        return await self._generate(prompt, list[Book])
+        return await self._generate(prompt, list[Book], stream)
 
-    async def related_to(self, title: str) -> List[Book]:
+    async def related_to(self, title: str, stream: bool = False) -> Recommendations:
         prompt = f"Most related books to '{title}'"
-        return await self._generate(prompt, list[Book])
+        return await self._generate(prompt, list[Book], stream)
 
-    async def user_preferred(self, titles: List[str]) -> List[Book]:
+    async def user_preferred(self, titles: List[str], stream: bool = False) -> Recommendations:
         joined = ", ".join(titles)
         prompt = f"Recommend books based on user's purchased list: {joined}"
-        return await self._generate(prompt, list[Book])
+        return await self._generate(prompt, list[Book], stream)
 
-    async def content_based(self, text: str) -> List[Book]:
+    async def content_based(self, text: str, stream: bool = False) -> Recommendations:
         prompt = f"Content-based recommendations for: {text}"
-        return await self._generate(prompt, list[Book])
+        return await self._generate(prompt, list[Book], stream)
 
-    async def collaborative(self, purchased: List[str]) -> List[Book]:
+    async def collaborative(self, purchased: List[str], stream: bool = False) -> Recommendations:
         joined = ", ".join(purchased)
         prompt = f"Collaborative filtering recommendations based on: {joined}"
-        return await self._generate(prompt, list[Book])
+        return await self._generate(prompt, list[Book], stream)
 
-    async def hybrid(self, purchased: List[str]) -> List[Book]:
+    async def hybrid(self, purchased: List[str], stream: bool = False) -> Recommendations:
         joined = ", ".join(purchased)
         prompt = f"Hybrid recommendations (content + collaborative) based on: {joined}"
-        return await self._generate(prompt, list[Book])
+        return await self._generate(prompt, list[Book], stream)
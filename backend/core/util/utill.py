@@ -1,21 +1,38 @@
 import os
-from groq import Groq
 from typing import List, Dict
 import json
 from models.sentiment_model import ReviewSentiment, ReviewSentimentList
 from dotenv import load_dotenv
 import os
+from ..metrics import count_attempt, stage
+from ..components import components
+from ..resilience import UPSTREAM_TIMEOUT, groq_policy
 
 # 1) load .env into environment
 load_dotenv()  
 
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+def _make_groq_client():
+    # SDK import deferred until the first LLM call
+    from groq import Groq, DefaultHttpxClient
+
+    return Groq(
+        api_key=os.getenv("GROQ_API_KEY"),
+        # retries are issued by groq_policy so they count against its budget
+        max_retries=0,
+        timeout=UPSTREAM_TIMEOUT,
+        # count HTTP attempts so any retry below the policy shows up in /metrics
+        http_client=DefaultHttpxClient(event_hooks={"request": [count_attempt]}),
+    )
+
+components.register("groq", _make_groq_client)
+
 MODEL = "llama3-70b-8192" 
 def groq_sentiment_single(review: str) -> Dict[str, float]:
     """
     Sends a single review to the Groq model and returns the sentiment analysis result.
     """
-    prompt = f"""
+    with stage("prompt_build"):
+        prompt = f"""
 You are a sentiment analysis API. ONLY return a valid JSON in the following format:
 
 {{
@@ -27,39 +44,48 @@ You are a sentiment analysis API. ONLY return a valid JSON in the following form
 Review: "{review}"
 """
 
-    resp = client.chat.completions.create(
+    resp = groq_policy.call("sentiment_single", lambda: components.get("groq").chat.completions.create(
         model=MODEL,
         messages=[{"role": "user", "content": prompt}],
         temperature=0.0,
         response_format={"type": "json_object"}
-    )
+    ))
 
-    return json.loads(resp.choices[0].message.content.strip())
+    with stage("json_parse"):
+        return json.loads(resp.choices[0].message.content.strip())
 
 def groq_sentiment_batch(reviews: List[str]) -> List[Dict]:
-    prompt = f"""
+    """
+    Scores numbered reviews in one call; each returned item carries the 1-based
+    ``id`` of the review it answers, since the model may drop or reorder items.
+    """
+    with stage("prompt_build"):
+        prompt = f"""
 You are a sentiment analysis API. ONLY return a valid JSON in the following format:
 
 {{
   "reviews": [
     {{
-      "review": "<text>",
+      "id": <number of the review>,
       "label": "Very Negative | Negative | Neutral | Positive | Very Positive",
       "score": float between -1.0 and 1.0
     }}
   ]
 }}
 
+Return one item per review. Each review is a JSON string after its number.
+
 Reviews:
-""" + "\n".join([f"- {review}" for review in reviews])
+""" + "\n".join([f"{n}. {json.dumps(review)}" for n, review in enumerate(reviews, 1)])
 
-    resp = client.chat.completions.create(
+    resp = groq_policy.call("sentiment_batch", lambda: components.get("groq").chat.completions.create(
         model=MODEL,
         messages=[{"role": "user", "content": prompt}],
         temperature=0.0,
         response_format={"type": "json_object"}
-    )
+    ))
 
-    raw = json.loads(resp.choices[0].message.content.strip())
+    with stage("json_parse"):
+        raw = json.loads(resp.choices[0].message.content.strip())
 
     return raw["reviews"]
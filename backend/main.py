@@ -1,67 +1,58 @@
+import time
+_started = time.perf_counter()
+
+import os
+import importlib
 from fastapi import FastAPI
-import uvicorn
-from models.sentiment_model import SingleRequest, SingleResponse, BatchRequest, BatchResponse
-from core.sentiment import analyze_batch, analyze_single
-from fastapi.responses import JSONResponse
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import List
-from core.util.recommender import BookRecommender, Book
+from fastapi.responses import JSONResponse, PlainTextResponse
+from core.metrics import REGISTRY, MetricsMiddleware
+from core.profiler import profiler
+from core.components import components
+from core.resilience import CircuitOpenError
+from models.debug_model import ProfilerConfig, ProfilerStatus
+components.record("import:framework", time.perf_counter() - _started)
+
+# Route groups to mount; e.g. ENABLED_BACKENDS=sentiment skips the Gemini
+# recommender entirely
+ENABLED_BACKENDS = [
+    name.strip() for name in os.getenv("ENABLED_BACKENDS", "sentiment,recommend,jobs").split(",") if name.strip()
+]
 
 app = FastAPI(title="Book Review Sentiment API")
-recommender = BookRecommender()
-
-@app.post("/sentiment/single", response_model=SingleResponse)
-async def sentiment_single(req: SingleRequest):
-    try:
-        out = analyze_single(req.review)
-        return SingleResponse(review=req.review, label=out.get("label"), score=out.get("score"), error=None)
-    except Exception as e:
-        return SingleResponse(review=req.review, label=None, score=None, error=str(e))
-
-@app.post("/sentiment/batch", response_model=BatchResponse)
-async def sentiment_batch(req: BatchRequest):
-    results = analyze_batch(req.reviews)
-    return BatchResponse(results=results)
-
-class QueryText(BaseModel):
-    query: str
-
-class TitlesList(BaseModel):
-    titles: List[str]
-
-# Endpoints
-@app.post("/recommend/similar", response_model=List[Book])
-async def recommend_similar(payload: QueryText):
-    return await recommender.similar_books(payload.query)
-
-@app.post("/recommend/author", response_model=List[Book])
-async def recommend_author(payload: QueryText):
-    return await recommender.by_author(payload.query)
-
-@app.post("/recommend/genre", response_model=List[Book])
-async def recommend_genre(payload: QueryText):
-    return await recommender.by_genre(payload.query)
-
-@app.post("/recommend/related", response_model=List[Book])
-async def recommend_related(payload: QueryText):
-    return await recommender.related_to(payload.query)
-
-@app.post("/recommend/user_preferred", response_model=List[Book])
-async def recommend_user_preferred(payload: TitlesList):
-    return await recommender.user_preferred(payload.titles)
-
-@app.post("/recommend/content_based", response_model=List[Book])
-async def recommend_content_based(payload: QueryText):
-    return await recommender.content_based(payload.query)
-
-@app.post("/recommend/collaborative", response_model=List[Book])
-async def recommend_collaborative(payload: TitlesList):
-    return await recommender.collaborative(payload.titles)
-
-@app.post("/recommend/hybrid", response_model=List[Book])
-async def recommend_hybrid(payload: TitlesList):
-    return await recommender.hybrid(payload.titles)
+app.add_middleware(
+    MetricsMiddleware,
+    on_request_start=profiler.request_started,
+    on_request_end=profiler.request_finished,
+)
+
+for backend in ENABLED_BACKENDS:
+    _phase_start = time.perf_counter()
+    app.include_router(importlib.import_module(f"routes.{backend}").router)
+    components.record(f"routes:{backend}", time.perf_counter() - _phase_start)
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open(request, exc: CircuitOpenError):
+    # Provider is failing and there was nothing cached to answer with
+    return JSONResponse(status_code=503, content={"detail": str(exc)},
+                        headers={"Retry-After": str(max(1, round(exc.retry_after)))})
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+# Runtime profiler switch; only exposed when explicitly enabled
+if os.getenv("ENABLE_DEBUG_ENDPOINTS") == "1":
+    @app.get("/debug/profiler", response_model=ProfilerStatus)
+    async def profiler_status():
+        return profiler.status()
+
+    @app.post("/debug/profiler", response_model=ProfilerStatus)
+    async def profiler_configure(cfg: ProfilerConfig):
+        profiler.configure(cfg.enabled, slow_ms=cfg.slow_ms, interval_ms=cfg.interval_ms, keep=cfg.keep)
+        return profiler.status()
+
+components.record("import:main", time.perf_counter() - _started)
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8001, reload=True)
\ No newline at end of file
+    import uvicorn
+    uvicorn.run("main:app", host="0.0.0.0", port=8001, reload=True)
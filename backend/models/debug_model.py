@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class ProfilerConfig(BaseModel):
+    enabled: bool
+    slow_ms: Optional[float] = Field(None, gt=0, description="Capture requests slower than this")
+    interval_ms: Optional[float] = Field(None, gt=0, description="Stack sampling interval")
+    keep: Optional[int] = Field(None, gt=0, description="Number of slow requests to keep")
+
+class SlowRequest(BaseModel):
+    endpoint: str
+    duration_ms: float
+    finished_at: float
+    samples: int
+    stacks: List[str]
+
+class ProfilerStatus(BaseModel):
+    enabled: bool
+    slow_ms: float
+    interval_ms: float
+    captured: List[SlowRequest]
@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from .sentiment_model import BatchResponseItem
+
+JobState = Literal["queued", "running", "completed", "cancelled", "failed"]
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: JobState
+    total: int
+    processed: int
+    errors: int = Field(..., description="Processed reviews that came back with an error")
+    created_at: float
+    updated_at: float
+    error: Optional[str] = None
+
+class JobResultsPage(BaseModel):
+    job_id: str
+    status: JobState
+    offset: int
+    next_offset: Optional[int] = Field(None, description="Offset of the next page; null once all results are read")
+    results: List[BatchResponseItem]
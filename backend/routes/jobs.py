@@ -0,0 +1,73 @@
+import os
+from typing import Optional
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+from models.sentiment_model import BatchRequest
+from models.job_model import JobStatus, JobResultsPage
+from core.sentiment import analyze_batch
+from core.jobs import JOBS_DB_PATH, TERMINAL, JobStore, JobWorkerPool
+from core.metrics import BATCH_SIZE, instrumented
+from core.components import components
+
+components.register("job_store", lambda: JobStore(JOBS_DB_PATH))
+_pool: Optional[JobWorkerPool] = None
+
+@asynccontextmanager
+async def lifespan(app):
+    # Started per server process (after the launcher forks), stopped on shutdown
+    global _pool
+    _pool = JobWorkerPool(
+        components.get("job_store"),
+        analyze_batch,
+        workers=int(os.getenv("JOB_WORKERS", "2")),
+        chunk_size=int(os.getenv("JOB_CHUNK_SIZE", "100")),
+        reviews_per_second=float(os.getenv("JOB_REVIEWS_PER_SECOND", "0")),
+    )
+    _pool.start()
+    try:
+        yield
+    finally:
+        _pool.stop()
+        _pool = None
+
+router = APIRouter(lifespan=lifespan)
+
+def _status_or_404(job_id: str) -> dict:
+    job = components.get("job_store").status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job
+
+@router.post("/sentiment/jobs", response_model=JobStatus, status_code=202)
+@instrumented
+async def submit_job(req: BatchRequest):
+    BATCH_SIZE.observe(len(req.reviews), endpoint="/sentiment/jobs")
+    job = await run_in_threadpool(components.get("job_store").submit, req.reviews)
+    if _pool is not None:
+        _pool.notify()
+    return job
+
+@router.get("/sentiment/jobs/{job_id}", response_model=JobStatus)
+@instrumented
+async def job_status(job_id: str):
+    return await run_in_threadpool(_status_or_404, job_id)
+
+@router.get("/sentiment/jobs/{job_id}/results", response_model=JobResultsPage)
+@instrumented
+async def job_results(job_id: str, offset: int = Query(0, ge=0), limit: int = Query(1000, ge=1, le=10000)):
+    job = await run_in_threadpool(_status_or_404, job_id)
+    results = await run_in_threadpool(components.get("job_store").results, job_id, offset, limit)
+    # Results are stored in submission order, so the next page starts after
+    # what was returned; a short page of a finished job is the last one
+    next_offset = offset + len(results)
+    if len(results) < limit and job["status"] in TERMINAL:
+        next_offset = None
+    return JobResultsPage(job_id=job_id, status=job["status"], offset=offset, next_offset=next_offset,
+                          results=results)
+
+@router.delete("/sentiment/jobs/{job_id}", response_model=JobStatus)
+@instrumented
+async def cancel_job(job_id: str):
+    await run_in_threadpool(_status_or_404, job_id)
+    return await run_in_threadpool(components.get("job_store").cancel, job_id)
@@ -0,0 +1,89 @@
+import json
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import AsyncIterator, List, Optional
+from core.util.recommender import BookRecommender, Book
+from core.metrics import instrumented
+
+router = APIRouter()
+# The Gemini client is created on the first request, not here
+recommender = BookRecommender()
+
+class QueryText(BaseModel):
+    query: str
+
+class TitlesList(BaseModel):
+    titles: List[str]
+
+# Sending one of these in Accept streams books as they are generated
+STREAM_MEDIA_TYPES = ("text/event-stream", "application/x-ndjson")
+
+def _stream_media_type(request: Request) -> Optional[str]:
+    accept = request.headers.get("accept", "")
+    return next((media for media in STREAM_MEDIA_TYPES if media in accept), None)
+
+async def _encode(books: AsyncIterator[Book], media_type: str) -> AsyncIterator[str]:
+    sse = media_type == "text/event-stream"
+    count = 0
+    try:
+        async for book in books:
+            count += 1
+            data = book.model_dump_json()
+            yield f"event: book\ndata: {data}\n\n" if sse else data + "\n"
+    except Exception as e:
+        # headers are already sent; report the failure in-band
+        error = json.dumps({"error": str(e)})
+        yield f"event: error\ndata: {error}\n\n" if sse else error + "\n"
+        return
+    if sse:
+        yield f"event: done\ndata: {json.dumps({'count': count})}\n\n"
+
+async def _respond(request: Request, method, arg):
+    media_type = _stream_media_type(request)
+    if media_type is None:
+        return await method(arg)
+    books = await method(arg, stream=True)
+    return StreamingResponse(_encode(books, media_type), media_type=media_type,
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# Endpoints
+@router.post("/recommend/similar", response_model=List[Book])
+@instrumented
+async def recommend_similar(payload: QueryText, request: Request):
+    return await _respond(request, recommender.similar_books, payload.query)
+
+@router.post("/recommend/author", response_model=List[Book])
+@instrumented
+async def recommend_author(payload: QueryText, request: Request):
+    return await _respond(request, recommender.by_author, payload.query)
+
+@router.post("/recommend/genre", response_model=List[Book])
+@instrumented
+async def recommend_genre(payload: QueryText, request: Request):
+    return await _respond(request, recommender.by_genre, payload.query)
+
+@router.post("/recommend/related", response_model=List[Book])
+@instrumented
+async def recommend_related(payload: QueryText, request: Request):
+    return await _respond(request, recommender.related_to, payload.query)
+
+@router.post("/recommend/user_preferred", response_model=List[Book])
+@instrumented
+async def recommend_user_preferred(payload: TitlesList, request: Request):
+    return await _respond(request, recommender.user_preferred, payload.titles)
+
+@router.post("/recommend/content_based", response_model=List[Book])
+@instrumented
+async def recommend_content_based(payload: QueryText, request: Request):
+    return await _respond(request, recommender.content_based, payload.query)
+
+@router.post("/recommend/collaborative", response_model=List[Book])
+@instrumented
+async def recommend_collaborative(payload: TitlesList, request: Request):
+    return await _respond(request, recommender.collaborative, payload.titles)
+
+@router.post("/recommend/hybrid", response_model=List[Book])
+@instrumented
+async def recommend_hybrid(payload: TitlesList, request: Request):
+    return await _respond(request, recommender.hybrid, payload.titles)
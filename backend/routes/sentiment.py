@@ -0,0 +1,31 @@
+from fastapi import APIRouter
+from starlette.concurrency import run_in_threadpool
+from models.sentiment_model import SingleRequest, SingleResponse, BatchRequest, BatchResponse
+from core.sentiment import analyze_batch, analyze_single, analyze_local
+from core.metrics import BATCH_SIZE, in_request_thread, instrumented
+
+router = APIRouter()
+
+@router.post("/sentiment/single", response_model=SingleResponse)
+@instrumented
+async def sentiment_single(req: SingleRequest):
+    try:
+        out = await run_in_threadpool(in_request_thread(analyze_single), req.review)
+        return SingleResponse(review=req.review, label=out.get("label"), score=out.get("score"), error=None)
+    except Exception as e:
+        return SingleResponse(review=req.review, label=None, score=None, error=str(e))
+
+@router.post("/sentiment/batch", response_model=BatchResponse)
+@instrumented
+async def sentiment_batch(req: BatchRequest):
+    BATCH_SIZE.observe(len(req.reviews), endpoint="/sentiment/batch")
+    results = await run_in_threadpool(in_request_thread(analyze_batch), req.reviews)
+    return BatchResponse(results=results)
+
+@router.post("/sentiment/local", response_model=BatchResponse)
+@instrumented
+async def sentiment_local(req: BatchRequest):
+    BATCH_SIZE.observe(len(req.reviews), endpoint="/sentiment/local")
+    # the scorer is CPU-bound Python; keep it off the event loop
+    results = await run_in_threadpool(in_request_thread(analyze_local), req.reviews)
+    return BatchResponse(results=results)
@@ -0,0 +1,50 @@
+import gc
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import resilience  # noqa: E402
+from core.resilience import CircuitBreaker, CircuitOpenError  # noqa: E402
+from core.util import recommender  # noqa: E402
+from models.recommendation_model import Book  # noqa: E402
+
+
+def _half_open(**kwargs) -> CircuitBreaker:
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_after=0, **kwargs)
+    breaker.record_failure()
+    return breaker
+
+
+def test_check_claims_probe_only_once():
+    breaker = _half_open()
+    assert breaker.check() is True
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+
+def test_check_without_claim_leaves_probe_free():
+    breaker = _half_open()
+    assert breaker.check(claim=False) is False
+    assert breaker.check() is True
+
+
+def test_leaked_probe_expires():
+    breaker = _half_open(probe_timeout=0)
+    assert breaker.check() is True
+    # the holder never reports back; the next caller gets the slot
+    assert breaker.check() is True
+
+
+def test_unstarted_stream_does_not_hold_probe(monkeypatch):
+    breaker = _half_open()
+    monkeypatch.setattr(resilience.gemini_policy, "breaker", breaker)
+
+    stream = recommender.BookRecommender()._stream("prompt", list[Book])
+    del stream
+    gc.collect()
+
+    assert breaker.state == "half_open"
+    assert breaker.check() is True
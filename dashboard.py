@@ -1,36 +1,80 @@
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from wordcloud import WordCloud
 
+from pipeline.cube import SAMPLE_COLUMNS, bucket_edges, build_cubes, build_samples, mean_compound, select, wc_bucket
+from pipeline.terms import build_term_table, frequencies
+
 st.set_page_config(
     page_title="Book Reviews EDA Dashboard",
     layout="wide"
 )
 
+ENRICHED_PATH = Path("./Datasets/cleaned_data/enriched_data.parquet")  # from pipeline/enrich.py
+CUBE_PATH = Path("./Datasets/cleaned_data/cube.parquet")
+TITLE_CUBE_PATH = Path("./Datasets/cleaned_data/title_cube.parquet")
+TERMS_PATH = Path("./Datasets/cleaned_data/terms.parquet")
+SAMPLES_PATH = Path("./Datasets/cleaned_data/samples.parquet")
+
+# Everything below is drawn from the precomputed tables; the raw rows are only
+# loaded (and the derived columns computed) when one of those tables is missing
 @st.cache_data
 def load_data():
     # Adjust filenames/paths if needed
-    df = pd.read_csv("./Datasets/cleaned_data/cleaned_data.csv")        # from sentiment_analysis.ipynb
-
-    return df
-
-# Load dataset
-data = load_data()
-
-# --- Add any derived columns if missing ---
-if 'clean_reviews' not in data:
-    data['clean_reviews'] = data['review/text'].str.lower()
-if 'word_count' not in data:
-    data['word_count'] = data['clean_reviews'].str.split().apply(len)
-if 'compound' not in data or 'Sentiment' not in data:
-    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-    vader = SentimentIntensityAnalyzer()
-    data['compound'] = data['clean_reviews'].apply(lambda t: vader.polarity_scores(t)['compound'])
-    data['Sentiment'] = data['compound'].apply(
-        lambda x: 'positive' if x >= 0.05 else 'negative' if x < -0.05 else 'neutral'
-    )
+    if ENRICHED_PATH.exists():
+        data = pd.read_parquet(ENRICHED_PATH)
+    else:
+        data = pd.read_csv("./Datasets/cleaned_data/cleaned_data.csv")        # from sentiment_analysis.ipynb
+
+    # --- Add any derived columns if missing ---
+    if 'clean_reviews' not in data:
+        data['clean_reviews'] = data['review/text'].str.lower()
+    if 'word_count' not in data:
+        data['word_count'] = data['clean_reviews'].str.split().apply(len)
+    if 'compound' not in data or 'Sentiment' not in data:
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        vader = SentimentIntensityAnalyzer()
+        data['compound'] = data['clean_reviews'].apply(lambda t: vader.polarity_scores(t)['compound'])
+        data['Sentiment'] = data['compound'].apply(
+            lambda x: 'positive' if x >= 0.05 else 'negative' if x < -0.05 else 'neutral'
+        )
+    if 'wc_bucket' not in data:
+        data['wc_bucket'] = wc_bucket(data['word_count'])
+    return data
+
+if not all(p.exists() for p in (ENRICHED_PATH, CUBE_PATH, TITLE_CUBE_PATH, TERMS_PATH, SAMPLES_PATH)):
+    st.warning("Precomputed tables not found, deriving them now. Run `python enrich.py` in `pipeline/` to skip this.")
+
+@st.cache_data
+def load_cubes():
+    if CUBE_PATH.exists() and TITLE_CUBE_PATH.exists():
+        return pd.read_parquet(CUBE_PATH), pd.read_parquet(TITLE_CUBE_PATH)
+    return build_cubes(load_data())
+
+cube, title_cube = load_cubes()
+
+@st.cache_data
+def load_terms():
+    if TERMS_PATH.exists():
+        terms = pd.read_parquet(TERMS_PATH)
+        # Tables written before terms were keyed by length bucket are rebuilt
+        if 'wc_bucket' in terms:
+            return terms
+    return build_term_table(load_data())
+
+terms = load_terms()
+
+@st.cache_data
+def load_samples():
+    if SAMPLES_PATH.exists():
+        return pd.read_parquet(SAMPLES_PATH)
+    return build_samples(load_data())
+
+samples = load_samples()
 
 st.title("📊 Book Reviews EDA & Visualization")
 
@@ -38,25 +82,25 @@ st.title("📊 Book Reviews EDA & Visualization")
 st.sidebar.header("🔎 Filters")
 sentiments = st.sidebar.multiselect(
     "Sentiment",
-    options=data['Sentiment'].unique(),
-    default=data['Sentiment'].unique()
+    options=cube['Sentiment'].unique(),
+    default=cube['Sentiment'].unique()
 )
-min_words, max_words = st.sidebar.slider(
-    "Review Length (words)",
-    int(data['word_count'].min()),
-    int(data['word_count'].max()),
-    (int(data['word_count'].quantile(0.05)), int(data['word_count'].quantile(0.95)))
+length_counts = cube.groupby('wc_bucket')['count'].sum().sort_index()
+length_share = length_counts.cumsum() / length_counts.sum()
+min_words, max_words = st.sidebar.select_slider(
+    "Review Length (words, bucket start)",
+    options=length_counts.index.tolist(),
+    value=(
+        int(length_share.index[length_share.searchsorted(0.05)]),
+        int(length_share.index[length_share.searchsorted(0.95)]),
+    )
 )
-genre_options = data['categories'].unique().tolist()
+genre_options = cube['categories'].unique().tolist()
 selected_genres = st.sidebar.multiselect("Genre", genre_options, default=genre_options)
 
-# Apply filters
-mask = (
-    data['Sentiment'].isin(sentiments) &
-    data['word_count'].between(min_words, max_words) &
-    data['categories'].isin(selected_genres)
-)
-df = data[mask]
+# Apply filters to the pre-aggregated cells
+cells = select(cube, sentiments, selected_genres, min_words, max_words)
+title_cells = select(title_cube, sentiments, selected_genres, min_words, max_words)
 
 # Layout: 2 rows x 2 cols
 col1, col2 = st.columns(2)
@@ -65,7 +109,7 @@ col3, col4 = st.columns(2)
 # 1. Sentiment Distribution Pie
 with col1:
     st.subheader("Sentiment Distribution")
-    counts = df['Sentiment'].value_counts()
+    counts = cells.groupby('Sentiment')['count'].sum().sort_values(ascending=False)
     fig, ax = plt.subplots()
     ax.pie(
         counts,
@@ -80,7 +124,7 @@ with col1:
 # 2. Genre Distribution Bar
 with col2:
     st.subheader("Top Genres by Count")
-    top_genres = df['categories'].value_counts().head(10)
+    top_genres = cells.groupby('categories')['count'].sum().sort_values(ascending=False).head(10)
     fig, ax = plt.subplots()
     sns.barplot(x=top_genres.values, y=top_genres.index, ax=ax)
     ax.set_xlabel("Number of Reviews")
@@ -89,15 +133,16 @@ with col2:
 # 3. Review Length Distribution
 with col3:
     st.subheader("Review Length Distribution")
+    lengths = cells.groupby('wc_bucket')['count'].sum()
     fig, ax = plt.subplots()
-    sns.histplot(df['word_count'], bins=30, kde=True, ax=ax)
+    sns.histplot(x=lengths.index, weights=lengths.values, bins=bucket_edges(min_words, max_words), ax=ax)
     ax.set_xlabel("Word Count")
     st.pyplot(fig)
 
 # 4. Average Sentiment Score by Genre
 with col4:
     st.subheader("Avg. Sentiment Score by Genre")
-    avg_score = df.groupby('categories')['compound'].mean().sort_values(ascending=False).head(10)
+    avg_score = mean_compound(cells, 'categories').sort_values(ascending=False).head(10)
     fig, ax = plt.subplots()
     sns.barplot(x=avg_score.values, y=avg_score.index, ax=ax)
     ax.set_xlabel("Average Compound Score")
@@ -107,7 +152,7 @@ st.markdown("---")
 
 # 5. Top N Most Loved Books
 st.subheader("🏆 Top 10 Most Loved Books")
-avg_book = df.groupby('Title')['compound'].mean().sort_values(ascending=False).head(10)
+avg_book = mean_compound(title_cells, 'Title').sort_values(ascending=False).head(10)
 fig, ax = plt.subplots(figsize=(6,4))
 sns.barplot(x=avg_book.values, y=avg_book.index, ax=ax)
 ax.set_xlabel("Average Compound Score")
@@ -116,17 +161,28 @@ st.pyplot(fig)
 # 6. WordCloud for Positive vs Negative
 st.subheader("🧠 WordCloud Comparison")
 
+term_cells = select(terms, sentiments, selected_genres, min_words, max_words)
 col5, col6 = st.columns(2)
 for sentiment, colw in zip(['positive','negative'], [col5, col6]):
     with colw:
         st.markdown(f"**{sentiment.title()} Reviews**")
-        text = " ".join(df[df['Sentiment']==sentiment]['clean_reviews'])
-        wc = WordCloud(width=400, height=200, background_color='white').generate(text)
+        freqs = frequencies(term_cells[term_cells['Sentiment']==sentiment])
+        if not freqs:
+            st.info("No reviews match the current filters.")
+            continue
+        wc = WordCloud(width=400, height=200, background_color='white').generate_from_frequencies(freqs)
         fig, ax = plt.subplots(figsize=(5,3))
         ax.imshow(wc, interpolation='bilinear')
         ax.axis('off')
         st.pyplot(fig)
 
+# A weighted draw from the per-cell samples stands in for sampling the filtered rows
+sample_cells = select(samples, sentiments, selected_genres, min_words, max_words)
+
 st.markdown("---")
 st.subheader("📄 Sample Filtered Reviews")
-st.dataframe(df[['Title','categories','Sentiment','compound','word_count']].sample(10))
+if sample_cells.empty:
+    st.info("No reviews match the current filters.")
+else:
+    shown = sample_cells.sample(min(10, len(sample_cells)), weights='weight')
+    st.dataframe(shown[SAMPLE_COLUMNS])
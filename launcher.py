@@ -1,9 +1,19 @@
 # launcher.py
+#
+# Dev mode (default): runs the dashboards and the API from .venv in parallel.
+# Production mode (--prod): pre-forking supervisor for N API workers, see below.
 
+import argparse
 import asyncio
+import logging
 import os
+import signal
+import socket
 import sys
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Dict, Optional
 
 async def run_scripts_in_venv():
     project_root = Path(__file__).parent.resolve()
@@ -56,5 +66,381 @@ async def run_scripts_in_venv():
     await asyncio.gather(*(p.wait() for _, p in procs))
     print("✅ All processes have exited.")
 
+
+# ---------------------------------------------------------------------------
+# Production mode
+#
+# The supervisor imports the FastAPI app and warms models/indexes once, binds
+# the listening socket, then forks the workers. Children inherit the loaded
+# pages copy-on-write and all accept() on the same socket. Each worker reports
+# readiness over a pipe once uvicorn has started and then keeps sending a
+# heartbeat over it from its event loop. Workers that never become ready, or
+# whose heartbeat stops, are killed; those and crashed workers are restarted
+# with exponential backoff. SIGHUP triggers a rolling restart in which a
+# replacement must be ready before the old worker is sent SIGTERM (uvicorn then
+# stops accepting and drains in-flight requests).
+#
+# Metrics and the profiler switch live in each worker's memory, and a request
+# to the shared port reaches an arbitrary worker. Each worker slot therefore
+# also listens on its own port (--worker-port-base + slot), where /metrics,
+# /debug/profiler and the API reach that worker only.
+# ---------------------------------------------------------------------------
+
+logger = logging.getLogger("launcher")
+
+
+@dataclass
+class Worker:
+    slot: int
+    pid: int
+    ready_fd: int
+    started_at: float = field(default_factory=time.monotonic)
+    last_beat: float = 0.0
+    ready: bool = False
+    retiring: bool = False
+
+
+class Supervisor:
+    def __init__(self, app, host: str, port: int, workers: int, ready_timeout: float = 60.0,
+                 graceful_timeout: float = 30.0, backoff_base: float = 1.0, backoff_max: float = 60.0,
+                 stable_after: float = 30.0, heartbeat_interval: float = 5.0,
+                 heartbeat_timeout: float = 30.0, worker_port_base: Optional[int] = None):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.n_workers = workers
+        self.ready_timeout = ready_timeout
+        self.graceful_timeout = graceful_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stable_after = stable_after
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.worker_port_base = worker_port_base
+        self.workers: Dict[int, Worker] = {}          # pid -> worker
+        self.failures: Dict[int, int] = {}            # slot -> consecutive crashes
+        self.restart_at: Dict[int, float] = {}        # slot -> monotonic time
+        self.sock: Optional[socket.socket] = None
+        self.worker_socks: Dict[int, socket.socket] = {}   # slot -> its own listening socket
+        self._stop = False
+        self._reload = False
+
+    # --- worker side -------------------------------------------------------
+
+    def _serve(self, slot: int, ready_w: int) -> None:
+        import uvicorn
+
+        for sig in (signal.SIGHUP, signal.SIGCHLD):
+            signal.signal(sig, signal.SIG_DFL)
+        # uvicorn re-raises the shutdown signal after draining; make that a no-op
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        config = uvicorn.Config(self.app, timeout_graceful_shutdown=self.graceful_timeout,
+                                log_level="info", access_log=False)
+        server = uvicorn.Server(config)
+
+        async def heartbeat():
+            # Beats come from the event loop, so a blocked loop stops them
+            while True:
+                await asyncio.sleep(self.heartbeat_interval)
+                try:
+                    os.write(ready_w, b".")
+                except BlockingIOError:
+                    pass
+                except OSError:
+                    return
+
+        async def run():
+            sockets = [self.sock] + ([self.worker_socks[slot]] if slot in self.worker_socks else [])
+            task = asyncio.create_task(server.serve(sockets=sockets))
+            while not server.started and not task.done():
+                await asyncio.sleep(0.05)
+            if not server.started:
+                os.close(ready_w)
+                await task
+                return
+            os.write(ready_w, b"1")
+            # a supervisor that falls behind must not block the event loop
+            os.set_blocking(ready_w, False)
+            beats = asyncio.create_task(heartbeat())
+            try:
+                await task
+            finally:
+                beats.cancel()
+                os.close(ready_w)
+
+        asyncio.run(run())
+
+    # --- supervisor side ---------------------------------------------------
+
+    def spawn(self, slot: int) -> Worker:
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            for other in self.workers.values():
+                os.close(other.ready_fd)
+            for other_slot, other_sock in self.worker_socks.items():
+                if other_slot != slot:
+                    other_sock.close()
+            code = 0
+            try:
+                self._serve(slot, ready_w)
+            except BaseException:
+                logger.exception(f"worker {slot} crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        os.close(ready_w)
+        worker = Worker(slot=slot, pid=pid, ready_fd=ready_r)
+        self.workers[pid] = worker
+        logger.info(f"🚀 worker {slot} started (PID={pid})")
+        return worker
+
+    def wait_ready(self, worker: Worker) -> bool:
+        """Block until the worker reports readiness, exits, or times out.
+
+        A worker that is not ready is killed; ``reap`` then schedules its
+        restart with backoff unless it was already marked as retiring.
+        """
+        import select
+
+        deadline = time.monotonic() + self.ready_timeout
+        while time.monotonic() < deadline and not self._stop:
+            readable, _, _ = select.select([worker.ready_fd], [], [], 0.2)
+            if readable:
+                worker.ready = os.read(worker.ready_fd, 1) == b"1"
+                break
+        if worker.ready:
+            # the pipe stays open for heartbeats
+            worker.last_beat = time.monotonic()
+            logger.info(f"✅ worker {worker.slot} ready (PID={worker.pid})")
+        else:
+            logger.error(f"❌ worker {worker.slot} not ready after {self.ready_timeout:.0f}s (PID={worker.pid})")
+            self.kill(worker)
+        return worker.ready
+
+    def kill(self, worker: Worker) -> None:
+        # SIGKILL: a worker that is not serving (or is stuck) cannot drain
+        try:
+            os.kill(worker.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def check_heartbeats(self) -> None:
+        """Read pending heartbeats and kill ready workers that went quiet."""
+        import select
+
+        live = {w.ready_fd: w for w in self.workers.values() if w.ready and w.ready_fd >= 0}
+        if live:
+            readable, _, _ = select.select(list(live), [], [], 0)
+            now = time.monotonic()
+            for fd in readable:
+                worker = live[fd]
+                if os.read(fd, 4096):
+                    worker.last_beat = now
+                else:
+                    # the worker closed its end on exit; reap() takes it from here
+                    os.close(fd)
+                    worker.ready_fd = -1
+        now = time.monotonic()
+        for worker in list(self.workers.values()):
+            if not worker.ready or worker.retiring or worker.ready_fd < 0:
+                continue
+            if now - worker.last_beat > self.heartbeat_timeout:
+                logger.error(f"💔 worker {worker.slot} (PID={worker.pid}) missed heartbeats for "
+                             f"{now - worker.last_beat:.0f}s; killing it")
+                os.close(worker.ready_fd)
+                worker.ready_fd = -1
+                self.kill(worker)
+
+    def reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self.workers.pop(pid, None)
+            if worker is None:
+                continue
+            if worker.ready_fd >= 0:
+                os.close(worker.ready_fd)
+            code = os.waitstatus_to_exitcode(status)
+            if worker.retiring or self._stop:
+                logger.info(f"worker {worker.slot} (PID={pid}) exited with {code}")
+                continue
+            # only a worker that served for a while resets the backoff
+            stable = worker.ready and time.monotonic() - worker.started_at >= self.stable_after
+            failures = 0 if stable else self.failures.get(worker.slot, 0) + 1
+            self.failures[worker.slot] = failures
+            delay = min(self.backoff_max, self.backoff_base * 2 ** max(failures - 1, 0))
+            self.restart_at[worker.slot] = time.monotonic() + delay
+            logger.warning(f"⚠️ worker {worker.slot} (PID={pid}) died with {code}; restarting in {delay:.1f}s")
+
+    def retire_others(self, new: Worker) -> None:
+        """SIGTERM the workers ``new`` replaces in its slot."""
+        for old in list(self.workers.values()):
+            if old.slot == new.slot and old is not new and not old.retiring:
+                old.retiring = True
+                os.kill(old.pid, signal.SIGTERM)
+
+    def restart_due(self) -> None:
+        now = time.monotonic()
+        for slot, at in list(self.restart_at.items()):
+            if at <= now and not self._stop:
+                del self.restart_at[slot]
+                new = self.spawn(slot)
+                # a retried rolling-restart replacement takes over from the old worker
+                if self.wait_ready(new):
+                    self.retire_others(new)
+
+    def rolling_restart(self) -> None:
+        logger.info("🔄 rolling restart")
+        for old in sorted(self.workers.values(), key=lambda w: w.slot):
+            if old.retiring or self._stop:
+                continue
+            new = self.spawn(old.slot)
+            if not self.wait_ready(new):
+                # the old worker keeps serving; reap() schedules another
+                # replacement with backoff, which retires it once ready
+                logger.error("rolling restart aborted; keeping remaining workers")
+                return
+            self.retire_others(new)
+            self.reap()
+
+    def shutdown(self) -> None:
+        logger.info("🛑 stopping workers")
+        for worker in self.workers.values():
+            try:
+                os.kill(worker.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for worker in list(self.workers.values()):
+            logger.warning(f"killing worker {worker.slot} (PID={worker.pid})")
+            os.kill(worker.pid, signal.SIGKILL)
+        self.reap()
+
+    def _listen(self, port: int) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def run(self) -> None:
+        self.sock = self._listen(self.port)
+        if self.worker_port_base:
+            # bound once, so a restarted worker takes over its slot's port
+            for slot in range(self.n_workers):
+                self.worker_socks[slot] = self._listen(self.worker_port_base + slot)
+
+        def on_stop(signum, frame):
+            self._stop = True
+
+        def on_reload(signum, frame):
+            self._reload = True
+
+        signal.signal(signal.SIGTERM, on_stop)
+        signal.signal(signal.SIGINT, on_stop)
+        signal.signal(signal.SIGHUP, on_reload)
+
+        logger.info(f"Serving on http://{self.host}:{self.port} with {self.n_workers} workers "
+                    f"(supervisor PID={os.getpid()}, SIGHUP = rolling restart)")
+        if self.worker_socks:
+            logger.info(f"Per-worker ports (metrics, profiler): {self.worker_port_base}-"
+                        f"{self.worker_port_base + self.n_workers - 1}")
+        for slot in range(self.n_workers):
+            self.wait_ready(self.spawn(slot))
+
+        try:
+            while not self._stop:
+                self.reap()
+                if self._reload:
+                    self._reload = False
+                    self.rolling_restart()
+                self.restart_due()
+                self.check_heartbeats()
+                time.sleep(0.2)
+        finally:
+            self.shutdown()
+            self.sock.close()
+            for sock in self.worker_socks.values():
+                sock.close()
+
+
+def load_backend_app():
+    """Import the API and warm everything workers should share copy-on-write."""
+    backend_dir = Path(__file__).parent.resolve() / "backend"
+    sys.path.insert(0, str(backend_dir))
+    import main  # noqa: E402
+    from core.components import components  # noqa: E402
+
+    # Components are lazy by default; create the ones this deployment will use
+    # so workers inherit them instead of each paying the first-request cost
+    names = []
+    if "sentiment" in main.ENABLED_BACKENDS:
+        from core import sentiment  # noqa: E402
+        if sentiment.LOCAL_MODEL_PATH.exists():
+            names.append("sentiment_model")
+        if os.getenv("GROQ_API_KEY"):
+            names.append("groq")
+    if "recommend" in main.ENABLED_BACKENDS and os.getenv("GEMINI_API_KEY"):
+        names.append("gemini")
+    for name, error in components.preload(names).items():
+        if error is None:
+            logger.info(f"Preloaded {name} in {components.timings[f'init:{name}'] * 1000:.0f} ms")
+    if components.loaded("sentiment_model"):
+        components.get("sentiment_model").score(["warm up"])
+    return main.app
+
+
+def run_production(args) -> None:
+    if os.name == "nt":
+        print("❌ Production mode needs fork(); run the API under a process manager on Windows.")
+        sys.exit(1)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [launcher] %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    app = load_backend_app()
+    Supervisor(
+        app,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        ready_timeout=args.ready_timeout,
+        graceful_timeout=args.graceful_timeout,
+        heartbeat_timeout=args.heartbeat_timeout,
+        worker_port_base=args.port + 1 if args.worker_port_base is None else args.worker_port_base,
+    ).run()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Start the dashboards and API")
+    parser.add_argument("--prod", action="store_true", help="Run only the API under the multi-worker supervisor")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--ready-timeout", type=float, default=60.0, help="Seconds a worker has to become ready")
+    parser.add_argument("--graceful-timeout", type=float, default=30.0,
+                        help="Seconds a stopping worker may spend draining in-flight requests")
+    parser.add_argument("--heartbeat-timeout", type=float, default=30.0,
+                        help="Seconds without a heartbeat after which a worker is restarted")
+    parser.add_argument("--worker-port-base", type=int, default=None,
+                        help="Worker N also listens on this port + N for per-worker /metrics and "
+                             "/debug/profiler (default: --port + 1; 0 disables)")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    asyncio.run(run_scripts_in_venv())
+    args = parse_args()
+    if args.prod:
+        run_production(args)
+    else:
+        asyncio.run(run_scripts_in_venv())
@@ -0,0 +1,101 @@
+"""
+cube.py
+
+Pre-aggregated statistics behind the dashboard charts. Reviews are grouped by
+(Sentiment, categories, wc_bucket) with their count and compound sums, plus a
+finer cube that also keys on Title. Any sidebar selection is then answered by
+summing the matching cells instead of rescanning the raw rows. The sample
+table keeps a few random reviews per cell for the dashboard's sample view.
+
+Imported by ``enrich.py`` (to write the cubes at ingest) and by
+``dashboard.py`` (to read them, or build them if they are missing).
+"""
+
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+# Left edges of the review-length buckets, in words
+WC_BUCKETS = [0, 5, 10, 15, 20, 25, 30, 40, 50, 60, 75, 100, 125, 150, 200,
+              250, 300, 400, 500, 750, 1000, 1500, 2000, 3000, 5000]
+
+CUBE_KEYS = ['Sentiment', 'categories', 'wc_bucket']
+CUBE_PATH = Path("../Datasets/cleaned_data/cube.parquet")
+TITLE_CUBE_PATH = Path("../Datasets/cleaned_data/title_cube.parquet")
+SAMPLES_PATH = Path("../Datasets/cleaned_data/samples.parquet")
+
+# Columns shown in the dashboard's sample table
+SAMPLE_COLUMNS = ['Title', 'categories', 'Sentiment', 'compound', 'word_count']
+SAMPLES_PER_CELL = 10
+
+
+def wc_bucket(word_count: pd.Series) -> pd.Series:
+    """Map word counts to the left edge of their bucket."""
+    edges = np.asarray(WC_BUCKETS)
+    idx = np.searchsorted(edges, word_count.to_numpy(), side='right') - 1
+    return pd.Series(edges[np.clip(idx, 0, None)], index=word_count.index, dtype='int32')
+
+
+def build_cubes(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Return ``(cube, title_cube)`` aggregated from the enriched rows."""
+    if 'wc_bucket' not in df:
+        df = df.assign(wc_bucket=wc_bucket(df['word_count']))
+
+    def aggregate(keys):
+        return (
+            df.groupby(keys, observed=True, dropna=False)['compound']
+            .agg(count='size', compound_n='count', compound_sum='sum')
+            .reset_index()
+        )
+
+    return aggregate(CUBE_KEYS), aggregate(CUBE_KEYS + ['Title'])
+
+
+def build_samples(df: pd.DataFrame, per_cell: int = SAMPLES_PER_CELL, seed: int = 0) -> pd.DataFrame:
+    """Up to ``per_cell`` random reviews per cube cell.
+
+    ``weight`` is how many reviews of its cell each sampled row stands for, so
+    a weighted draw from the samples of any set of cells approximates a uniform
+    draw from the reviews in those cells.
+    """
+    if 'wc_bucket' not in df:
+        df = df.assign(wc_bucket=wc_bucket(df['word_count']))
+    columns = list(dict.fromkeys(CUBE_KEYS + SAMPLE_COLUMNS))
+    shuffled = df[columns].sample(frac=1, random_state=seed)
+    groups = shuffled.groupby(CUBE_KEYS, observed=True, dropna=False)
+    cell_size = groups['compound'].transform('size')
+    samples = groups.head(per_cell)
+    kept = samples.groupby(CUBE_KEYS, observed=True, dropna=False)['compound'].transform('size')
+    return samples.assign(weight=cell_size.loc[samples.index] / kept).reset_index(drop=True)
+
+
+def save_cubes(cube: pd.DataFrame, title_cube: pd.DataFrame,
+               cube_path: Path = CUBE_PATH, title_cube_path: Path = TITLE_CUBE_PATH) -> None:
+    cube_path.parent.mkdir(parents=True, exist_ok=True)
+    cube.to_parquet(cube_path, index=False)
+    title_cube.to_parquet(title_cube_path, index=False)
+
+
+def select(cube: pd.DataFrame, sentiments, genres, min_bucket: int, max_bucket: int) -> pd.DataFrame:
+    """Cells matching a sidebar selection (length buckets inclusive)."""
+    mask = (
+        cube['Sentiment'].isin(sentiments) &
+        cube['categories'].isin(genres) &
+        cube['wc_bucket'].between(min_bucket, max_bucket)
+    )
+    return cube[mask]
+
+
+def mean_compound(cells: pd.DataFrame, by: str) -> pd.Series:
+    """Average compound score per ``by`` value, from summed cells."""
+    sums = cells.groupby(by, observed=True)[['compound_sum', 'compound_n']].sum()
+    return (sums['compound_sum'] / sums['compound_n']).dropna()
+
+
+def bucket_edges(min_bucket: int, max_bucket: int) -> list:
+    """Histogram bin edges covering the buckets from ``min_bucket`` to ``max_bucket``."""
+    edges = [b for b in WC_BUCKETS if min_bucket <= b <= max_bucket]
+    later = [b for b in WC_BUCKETS if b > max_bucket]
+    return edges + [later[0] if later else max_bucket * 2]
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+enrich.py
+
+Precomputes the derived columns used by the EDA dashboard (``clean_reviews``,
+``word_count``, VADER ``compound`` and ``Sentiment``) and stores them with the
+dataset as Parquet, so Streamlit processes load them instead of scoring every
+row at startup. VADER scoring runs in a process pool, and on reruns only
+reviews whose text has not been scored before are sent to it. The aggregate
+cubes and review samples from ``cube.py`` and the word-cloud term table from
+``terms.py`` are rebuilt alongside.
+
+Usage:
+    python enrich.py --workers 8
+"""
+
+import argparse
+import logging
+import os
+import sys
+from multiprocessing import Pool
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from cube import build_cubes, build_samples, save_cubes, wc_bucket
+from terms import build_term_table
+
+# Constants
+DATA_PATH = Path("../Datasets/cleaned_data/cleaned_data.csv")
+ENRICHED_PATH = Path("../Datasets/cleaned_data/enriched_data.parquet")
+CHUNK_SIZE = 2_000
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+_vader = None
+
+
+def _init_worker():
+    global _vader
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    _vader = SentimentIntensityAnalyzer()
+
+
+def _score_chunk(texts):
+    return [_vader.polarity_scores(t)['compound'] for t in texts]
+
+
+def label_sentiment(compound: pd.Series) -> pd.Series:
+    """Vectorised version of the dashboard's compound -> label thresholds."""
+    return pd.Series(
+        np.select([compound >= 0.05, compound < -0.05], ['positive', 'negative'], 'neutral'),
+        index=compound.index,
+    )
+
+
+def review_hash(texts: pd.Series) -> pd.Series:
+    return pd.util.hash_pandas_object(texts, index=False)
+
+
+def score_texts(texts: list, workers: int) -> list:
+    chunks = [texts[i:i + CHUNK_SIZE] for i in range(0, len(texts), CHUNK_SIZE)]
+    if workers <= 1 or len(chunks) <= 1:
+        _init_worker()
+        return [s for chunk in chunks for s in _score_chunk(chunk)]
+    with Pool(workers, initializer=_init_worker) as pool:
+        return [s for part in pool.imap(_score_chunk, chunks) for s in part]
+
+
+def enrich(df: pd.DataFrame, previous: pd.DataFrame = None, workers: int = 1) -> pd.DataFrame:
+    """Add derived columns to ``df``, reusing scores from ``previous`` where the text matches."""
+    if 'clean_reviews' not in df:
+        df['clean_reviews'] = df['review/text'].str.lower()
+    df['clean_reviews'] = df['clean_reviews'].fillna('').astype(str)
+    df['word_count'] = df['clean_reviews'].str.split().str.len().astype('int32')
+    df['wc_bucket'] = wc_bucket(df['word_count'])
+
+    df['review_hash'] = review_hash(df['clean_reviews'])
+    known = pd.Series(dtype='float64')
+    if previous is not None and {'review_hash', 'compound'} <= set(previous.columns):
+        known = previous.drop_duplicates('review_hash').set_index('review_hash')['compound']
+
+    # Scores already in the CSV are kept; only rows without one are looked up or scored
+    given = df['compound'].astype('float64') if 'compound' in df else pd.Series(np.nan, index=df.index)
+    own = given.groupby(df['review_hash']).first()
+    compound = given.fillna(df['review_hash'].map(own)).fillna(df['review_hash'].map(known))
+    missing = compound.isna()
+    todo = df.loc[missing, ['review_hash', 'clean_reviews']].drop_duplicates('review_hash')
+    logger.info(f"{len(df) - int(missing.sum()):,} rows reuse stored scores, scoring {len(todo):,} new reviews")
+
+    if len(todo):
+        scores = pd.Series(score_texts(todo['clean_reviews'].tolist(), workers), index=todo['review_hash'].values)
+        compound[missing] = df.loc[missing, 'review_hash'].map(scores)
+
+    sentiment = label_sentiment(compound)
+    if 'Sentiment' in df:
+        sentiment = df['Sentiment'].where(given.notna() & df['Sentiment'].notna(), sentiment)
+    df['compound'] = compound.astype('float64')
+    df['Sentiment'] = sentiment
+    return df
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Precompute dashboard columns")
+    parser.add_argument("--data", type=Path, default=DATA_PATH, help="Cleaned CSV to enrich")
+    parser.add_argument("--out", type=Path, default=ENRICHED_PATH, help="Parquet file to write")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="VADER scoring processes")
+    parser.add_argument("--full", action="store_true", help="Ignore previously stored scores")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not args.data.exists():
+        logger.error(f"Data file not found: {args.data}")
+        sys.exit(1)
+
+    df = pd.read_csv(args.data)
+    logger.info(f"Loaded {len(df):,} rows from {args.data}")
+
+    previous = None
+    if args.out.exists() and not args.full and 'review_hash' in pq.read_schema(args.out).names:
+        previous = pd.read_parquet(args.out, columns=['review_hash', 'compound'])
+        logger.info(f"Loaded {len(previous):,} stored scores from {args.out}")
+
+    df = enrich(df, previous, workers=args.workers)
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(args.out, index=False)
+    logger.info(f"Enriched data saved to {args.out}")
+
+    cube, title_cube = build_cubes(df)
+    save_cubes(cube, title_cube, args.out.with_name("cube.parquet"), args.out.with_name("title_cube.parquet"))
+    logger.info(f"Aggregate cubes saved ({len(cube):,} cells, {len(title_cube):,} title cells)")
+
+    samples = build_samples(df)
+    samples.to_parquet(args.out.with_name("samples.parquet"), index=False)
+    logger.info(f"Review samples saved ({len(samples):,} rows)")
+
+    terms = build_term_table(df, workers=args.workers)
+    terms.to_parquet(args.out.with_name("terms.parquet"), index=False)
+    logger.info(f"Term table saved ({len(terms):,} rows)")
+
+
+if __name__ == "__main__":
+    main()
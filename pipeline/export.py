@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+export.py
+
+Converts a trained TF-IDF + LogisticRegression pipeline into the compact
+serving artifact read by ``backend/core/scorer.py``: a directory of raw
+``.npy`` arrays (sorted vocabulary, column map, IDF vector, coefficients)
+plus a small ``meta.json``. The arrays can be memory-mapped, so API workers
+share them and never unpickle sklearn objects.
+
+Usage:
+    python export.py --model ../Models/logreg_sentiment.pkl --out ../Models/logreg_sentiment
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.pipeline import Pipeline
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+from core.scorer import FORMAT_VERSION, META_FILE, CompactScorer  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+PARITY_SAMPLES = [
+    "I loved the book, it was fascinating and engaging.",
+    "The plot was predictable and the ending fell flat.",
+    "Too slow at times, but the characters were well written.",
+    "",
+]
+
+
+def _is_ovr(clf) -> bool:
+    """Mirror LogisticRegression.predict_proba's choice between OvR and softmax."""
+    multi_class = getattr(clf, "multi_class", "auto")
+    return multi_class in ["ovr", "warn"] or (
+        multi_class in ["auto", "deprecated"]
+        and (len(clf.classes_) <= 2 or getattr(clf, "solver", None) == "liblinear")
+    )
+
+
+def export_model(pipeline: Pipeline, dest: Path, check_texts=None) -> Path:
+    """Write the compact artifact for ``pipeline`` to ``dest`` and verify parity."""
+    if not isinstance(pipeline, Pipeline) or len(pipeline.steps) != 2:
+        raise ValueError("Expected a two-step Pipeline of (TfidfVectorizer, LogisticRegression)")
+    vec, clf = pipeline.steps[0][1], pipeline.steps[1][1]
+
+    if vec.analyzer != "word" or vec.tokenizer is not None or vec.preprocessor is not None:
+        raise ValueError("Only the default word analyzer can be exported")
+    if callable(vec.strip_accents):
+        raise ValueError("Custom strip_accents callables can not be exported")
+
+    dest.mkdir(parents=True, exist_ok=True)
+
+    # Vocabulary as a sorted fixed-width byte array + matching column indices
+    vocab = vec.vocabulary_
+    encoded = np.array([t.encode("utf-8") for t in vocab])
+    order = np.argsort(encoded, kind="stable")
+    terms = encoded[order]
+    columns = np.array([vocab[t] for t in vocab], dtype=np.int32)[order]
+    np.save(dest / "terms.npy", terms)
+    np.save(dest / "columns.npy", columns)
+
+    use_idf = bool(getattr(vec, "use_idf", False))
+    if use_idf:
+        np.save(dest / "idf.npy", np.ascontiguousarray(vec.idf_, dtype=np.float64))
+    np.save(dest / "coef_t.npy", np.ascontiguousarray(clf.coef_.T, dtype=np.float64))
+    np.save(dest / "intercept.npy", np.ascontiguousarray(clf.intercept_, dtype=np.float64))
+
+    stop_words = vec.get_stop_words()
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "classes": [c.item() if hasattr(c, "item") else c for c in clf.classes_],
+        "ovr": _is_ovr(clf),
+        "lowercase": vec.lowercase,
+        "strip_accents": vec.strip_accents,
+        "token_pattern": vec.token_pattern,
+        "ngram_range": list(vec.ngram_range),
+        "stop_words": sorted(stop_words) if stop_words else None,
+        "binary": vec.binary,
+        "use_idf": use_idf,
+        "sublinear_tf": bool(getattr(vec, "sublinear_tf", False)),
+        "norm": getattr(vec, "norm", None),
+    }
+    (dest / META_FILE).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+    texts = list(check_texts) if check_texts is not None else PARITY_SAMPLES
+    expected = pipeline.predict_proba(texts)
+    actual = CompactScorer(dest).predict_proba(texts)
+    if not np.allclose(expected, actual, rtol=0, atol=1e-12):
+        raise RuntimeError(f"Exported scorer diverges from pipeline (max abs diff {np.abs(expected - actual).max():.3g})")
+
+    size = sum(p.stat().st_size for p in dest.iterdir())
+    logger.info(f"Compact model exported to {dest} ({size / 1024:.0f} KB)")
+    return dest
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export sentiment pipeline to compact serving format")
+    parser.add_argument("--model", type=Path, required=True, help="Path to the joblib-pickled Pipeline")
+    parser.add_argument("--out", type=Path, required=True, help="Destination directory for the artifact")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    pipeline = joblib.load(args.model)
+    export_model(pipeline, args.out)
+
+
+if __name__ == "__main__":
+    main()
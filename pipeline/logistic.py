@@ -4,7 +4,7 @@ logistic.py
 
 A production‑ready training pipeline for book‑review sentiment classification
 using Logistic Regression. Reads cleaned CSV, vectorizes text, trains, evaluates,
-and saves the model artifact.
+and saves the model artifact (plus a compact memory-mappable export for serving).
 
 Usage:
     python logistic.py --sample-size 10000
@@ -28,10 +28,13 @@ from sklearn.metrics import (
 from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 
+from export import export_model
+
 # Constants
 DATA_PATH = Path("../Datasets/cleaned_data/cleaned_data.csv")
 MODEL_PATH = Path("../Models")
 MODEL_NAME = "logreg_sentiment.pkl"
+EXPORT_NAME = "logreg_sentiment"
 
 # Configure logging
 logging.basicConfig(
@@ -153,6 +156,7 @@ def main():
     df = load_data(DATA_PATH, sample_size=args.sample_size)
     pipeline = train_and_evaluate(df)
     save_model(pipeline, MODEL_PATH, MODEL_NAME)
+    export_model(pipeline, MODEL_PATH / EXPORT_NAME, check_texts=df['clean_reviews'].head(1000))
 
 
 if __name__ == "__main__":
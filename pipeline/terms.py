@@ -0,0 +1,124 @@
+"""
+terms.py
+
+Term-frequency index behind the dashboard word clouds. At ingest the reviews
+of every (Sentiment, categories, wc_bucket) group are tokenized the way
+``WordCloud.process_text`` does it and reduced to unigram counts, bigram
+counts and a word total. Those are all additive, so at render time the rows
+for the selected filters are summed and ``frequencies`` replays WordCloud's
+plural merging and collocation scoring on the totals. The result goes to
+``WordCloud.generate_from_frequencies`` and the review text is never joined.
+
+Imported by ``enrich.py`` (to write the table) and ``dashboard.py``.
+"""
+
+import re
+from collections import Counter, defaultdict
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Dict, Tuple
+
+import pandas as pd
+from wordcloud import STOPWORDS
+from wordcloud.tokenization import score
+
+TERMS_PATH = Path("../Datasets/cleaned_data/terms.parquet")
+GROUP_KEYS = ['Sentiment', 'categories', 'wc_bucket']
+# Terms kept per group and kind; clouds only draw the top 200 words
+TOP_TERMS = 2_000
+COLLOCATION_THRESHOLD = 30
+CHUNK_SIZE = 5_000
+
+_WORD_RE = re.compile(r"\w[\w']*")
+_STOPWORDS = frozenset(w.lower() for w in STOPWORDS)
+
+
+def _tokenize(text: str):
+    words = _WORD_RE.findall(text.lower())
+    words = [w[:-2] if w.endswith("'s") else w for w in words]
+    return [w for w in words if not w.isdigit()]
+
+
+def _count_chunk(rows):
+    """Unigram/bigram counters and word totals per group for a chunk of rows."""
+    out: Dict[Tuple, list] = {}
+    for key, text in rows:
+        uni, bi, total = out.setdefault(key, [Counter(), Counter(), 0])
+        words = _tokenize(text)
+        kept = [w for w in words if w not in _STOPWORDS]
+        uni.update(kept)
+        bi.update(f"{a} {b}" for a, b in zip(words, words[1:])
+                  if a not in _STOPWORDS and b not in _STOPWORDS)
+        out[key][2] = total + len(kept)
+    return out
+
+
+def build_term_table(df: pd.DataFrame, workers: int = 1, top: int = TOP_TERMS) -> pd.DataFrame:
+    """Long table of (Sentiment, categories, wc_bucket, kind, term, count)."""
+    keys = list(zip(*(df[k] for k in GROUP_KEYS)))
+    rows = list(zip(keys, df['clean_reviews'].fillna('').astype(str)))
+    chunks = [rows[i:i + CHUNK_SIZE] for i in range(0, len(rows), CHUNK_SIZE)]
+
+    merged: Dict[Tuple, list] = defaultdict(lambda: [Counter(), Counter(), 0])
+    if workers <= 1 or len(chunks) <= 1:
+        parts = map(_count_chunk, chunks)
+        pool = None
+    else:
+        pool = Pool(workers)
+        parts = pool.imap_unordered(_count_chunk, chunks)
+    try:
+        for part in parts:
+            for key, (uni, bi, total) in part.items():
+                acc = merged[key]
+                acc[0].update(uni)
+                acc[1].update(bi)
+                acc[2] += total
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    records = []
+    for key, (uni, bi, total) in merged.items():
+        records.append(key + ('total', '', total))
+        records.extend(key + ('unigram', t, c) for t, c in uni.most_common(top))
+        records.extend(key + ('bigram', t, c) for t, c in bi.most_common(top))
+    table = pd.DataFrame.from_records(records, columns=GROUP_KEYS + ['kind', 'term', 'count'])
+    table['kind'] = table['kind'].astype('category')
+    table['wc_bucket'] = table['wc_bucket'].astype('int32')
+    table['count'] = table['count'].astype('int64')
+    return table
+
+
+def _merge_plurals(counts: Dict[str, int]) -> Tuple[Dict[str, int], Dict[str, str]]:
+    """Fold "words" into "word" like wordcloud's process_tokens (lower-case input)."""
+    counts = dict(counts)
+    standard = {k: k for k in counts}
+    for key in list(counts):
+        if key.endswith('s') and not key.endswith('ss') and key[:-1] in counts:
+            counts[key[:-1]] += counts.pop(key)
+            standard[key] = key[:-1]
+    return counts, standard
+
+
+def frequencies(cells: pd.DataFrame, collocations: bool = True) -> Dict[str, int]:
+    """Word -> frequency for ``generate_from_frequencies`` from summed table rows."""
+    sums = cells.groupby(['kind', 'term'], observed=True)['count'].sum()
+    unigrams = sums.get('unigram', pd.Series(dtype='int64')).to_dict()
+    counts, standard = _merge_plurals(unigrams)
+    if not collocations:
+        return counts
+
+    n_words = int(sums.get('total', pd.Series(dtype='int64')).sum())
+    bigrams, _ = _merge_plurals(sums.get('bigram', pd.Series(dtype='int64')).to_dict())
+    orig = dict(counts)
+    for bigram, count in bigrams.items():
+        first, second = bigram.split(" ")
+        word1, word2 = standard.get(first, first), standard.get(second, second)
+        if word1 not in orig or word2 not in orig:
+            continue
+        if score(count, orig[word1], orig[word2], n_words) > COLLOCATION_THRESHOLD:
+            counts[word1] -= count
+            counts[word2] -= count
+            counts[bigram] = count
+    return {w: c for w, c in counts.items() if c > 0}